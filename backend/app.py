@@ -1,33 +1,303 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from scanner.headers import scan_security_headers
-from scanner.injection import scan_injection
-from scanner.ssrf import scan_ssrf
-from scanner.crawler import crawl_domain
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from scanner.cache import ResponseCache
+from scanner.callback import start_callback_listener
+from scanner.client import HttpClientConfig
+from scanner.engine import ScanEngine, run_sync
+from scanner.crawler import crawl_domain_async
+from scanner.endpoints import EndpointInventory
+from scanner import hooks
+from scanner.metrics import ScanMetrics
+from scanner.scan import scan_url_async, scan_urls_async
+from scanner.templates import cluster_urls
+from scanner.trace import ScanTrace, span
+import asyncio
+import contextlib
+import hashlib
 import json
 import os
+import time
+import uuid
 from datetime import datetime
-from report import save_scan_results  # assumes this writes JSON + HTML into scan_results/
+from report import iter_html_report, save_scan_results  # assumes this writes JSON + HTML into scan_results/
+from jobs import JobManager
+from store import ScanStore
+from worker import start_local_workers
+from workqueue import LEASE_SECONDS, MemoryWorkQueue, create_work_queue
+import threading
 
 app = Flask(__name__)
 CORS(app)
 
+# Requests in flight across the crawl and every check of one scan
+SCAN_CONCURRENCY = 100
+
+# One pooled client per scan; every module reuses its keep-alive connections
+SCAN_HTTP_CONFIG = HttpClientConfig(
+    pool_size=SCAN_CONCURRENCY,
+    per_host_pool_size=SCAN_CONCURRENCY,
+    keepalive_timeout=30,
+    dns_cache_ttl=300,
+    connect_timeout=3,
+    timeout=10,
+    retries=1,
+)
+
+# Pages the crawler fetched are kept for the checks that need them again
+SCAN_CACHE_MAX_ENTRIES = 1000
+SCAN_CACHE_MAX_BYTES = 64 * 1024 * 1024
+SCAN_CACHE_SPILL_TO_DISK = False
+
+# URLs sharing a path and parameter names (product.php?id=1, ?id=2, ...)
+# are scanned through this many representatives; 0 scans every URL
+SCAN_REPRESENTATIVES_PER_TEMPLATE = 2
+
+# Crawl progress is logged here per target; rescanning a target whose crawl
+# was interrupted (crash, restart, deploy) resumes it instead of starting over
+CRAWL_CHECKPOINT_DIR = os.path.join("scan_results", "checkpoints")
+
+# Per-URL scans are run on this event loop when None; otherwise they are
+# handed to a work queue ("memory", or "sqlite:///<path>" also shared with
+# `python worker.py` processes on this host; not across hosts) and consumed
+# by this many worker processes started alongside the app
+SCAN_WORK_QUEUE = None
+SCAN_LOCAL_WORKERS = 2
+
+# Seconds a work queue batch may go without any URL finishing before its
+# unfinished URLs are reported as "Scan Error" results (a worker died
+# mid-task, or no worker is consuming the queue). Longer than the SQLite
+# queue's lease, so tasks of a dead worker there are handed out again first.
+SCAN_WORK_QUEUE_IDLE_TIMEOUT = 2 * LEASE_SECONDS
+
+# Out-of-band callback listener for blind SSRF, started when targets can
+# reach it at CALLBACK_PUBLIC_URL (e.g. "http://scanner.example.com:8900");
+# without it SSRF falls back to matching indicators in responses. A DNS
+# responder is added when CALLBACK_DNS_PORT and a domain delegated to this
+# host (CALLBACK_DNS_DOMAIN) are set. Worker processes always fall back.
+CALLBACK_PUBLIC_URL = None
+CALLBACK_HOST = "0.0.0.0"
+CALLBACK_PORT = 8900
+CALLBACK_DNS_PORT = None
+CALLBACK_DNS_DOMAIN = None
+
+# Scanner metrics served at /metrics in the Prometheus text format. When
+# disabled no instrumentation hooks are installed and /metrics returns 404.
+METRICS_ENABLED = True
+
+# Background scans running at once for POST /scans, and finished jobs kept
+MAX_CONCURRENT_SCANS = 4
+MAX_KEPT_JOBS = 100
+
+# Completed scans are persisted here and served by the /scans endpoints
+SCAN_STORE_PATH = os.path.join("scan_results", "scans.db")
+
+# Seconds between progress events on a scan's event stream, and between
+# keep-alive comments when nothing else has been sent
+PROGRESS_INTERVAL = 1.0
+STREAM_KEEPALIVE = 15
+
+
 def scan_url(url):
-    results = []
+    return run_sync(scan_url_async, url)
+
+
+async def run_scan(target_url, job=None):
+    """
+    Crawl the target and scan every discovered URL on one event loop.
+    When a background `job` is given its counters and partial results
+    are updated as the scan progresses, with findings published per check
+    and progress published every PROGRESS_INTERVAL seconds. The returned
+    ScanTrace holds the timing span tree of the crawl and every check.
+    """
+    cache = ResponseCache(
+        max_entries=SCAN_CACHE_MAX_ENTRIES,
+        max_bytes=SCAN_CACHE_MAX_BYTES,
+        spill_to_disk=SCAN_CACHE_SPILL_TO_DISK,
+    )
+    on_results = job.add_results if job else None
+    progress_task = asyncio.ensure_future(publish_progress(job)) if job else None
+    inventory = EndpointInventory()
+    stats = job.stats if job else {}
+    trace = ScanTrace(target_url)
+    if CALLBACK_PUBLIC_URL:
+        # Binding blocks, so it runs off the scan's event loop
+        await asyncio.to_thread(
+            start_callback_listener,
+            host=CALLBACK_HOST,
+            port=CALLBACK_PORT,
+            public_url=CALLBACK_PUBLIC_URL,
+            dns_port=CALLBACK_DNS_PORT,
+            dns_domain=CALLBACK_DNS_DOMAIN,
+        )
+    for hook in hooks.SCAN_HOOKS:
+        hook(1)
     try:
-        header_results = scan_security_headers(url)
-        injection_results = scan_injection(url)
-        ssrf_results = scan_ssrf(url)
-        results.extend(header_results + injection_results + ssrf_results)
-    except Exception as e:
-        results.append({
-            "type": "Scan Error",
-            "url": url,
-            "error": str(e),
-            "severity": "Low"
-        })
-    return results
+        async with ScanEngine(concurrency=SCAN_CONCURRENCY, http_config=SCAN_HTTP_CONFIG, cache=cache,
+                              stats=stats) as engine:
+            with trace.activate():
+                with span("crawl", "stage"), crawl_checkpoint(target_url) as checkpoint_path:
+                    crawled_urls = await crawl_domain_async(
+                        target_url,
+                        engine,
+                        checkpoint_path=checkpoint_path,
+                        resume=True,
+                        inventory=inventory,
+                    )
+                if job:
+                    job.set_discovered_urls(crawled_urls)
+                url_templates = cluster_urls(crawled_urls, SCAN_REPRESENTATIVES_PER_TEMPLATE)
+                all_results = []
+
+                # URL -> results callback for every representative, plus form
+                # actions the crawl never fetched (e.g. POST-only login handlers)
+                callbacks = {
+                    url: tag_template_results(template, on_results)
+                    for template in url_templates
+                    for url in template["scanned_urls"]
+                }
+                for url in inventory.unreached_form_urls(callbacks):
+                    callbacks[url] = on_results
+
+                with span("scan", "stage"):
+                    work_queue = get_work_queue()
+                    if work_queue is not None:
+                        all_results = await scan_on_work_queue(work_queue, callbacks, inventory)
+                    else:
+                        def on_url_results(url, results):
+                            if callbacks[url]:
+                                callbacks[url](results)
+
+                        all_results = await scan_urls_async(
+                            list(callbacks),
+                            engine,
+                            endpoints_for=inventory.for_url,
+                            on_results=on_url_results,
+                        )
+            if engine.limiter:
+                stats["host_limits"] = engine.limiter.stats()
+    finally:
+        if progress_task:
+            progress_task.cancel()
+        cache.close()
+        for hook in hooks.SCAN_HOOKS:
+            hook(-1)
+
+    return crawled_urls, all_results, url_templates, inventory.to_list(), dict(stats), trace
+
+
+async def scan_on_work_queue(work_queue, callbacks, inventory):
+    """
+    Submit every URL in `callbacks` to the work queue as one batch and
+    collect findings as workers finish each URL, passing them to the URL's
+    callback. Requests sent and params skipped by workers are not counted
+    in the scan's stats. If no URL finishes for SCAN_WORK_QUEUE_IDLE_TIMEOUT
+    seconds, the rest are reported as "Scan Error" results.
+    """
+    batch_id = uuid.uuid4().hex
+    tasks = [{"url": url, "endpoints": inventory.for_url(url)} for url in callbacks]
+    await asyncio.to_thread(work_queue.submit, batch_id, tasks)
+
+    all_results = []
+    remaining = set(callbacks)
+
+    def collect(url, results):
+        remaining.discard(url)
+        if callbacks[url]:
+            callbacks[url](results)
+        for hook in hooks.FINDING_HOOKS:
+            hook(results)
+        all_results.extend(results)
+
+    try:
+        last_progress = time.monotonic()
+        while remaining:
+            for url, results in await asyncio.to_thread(work_queue.fetch_results, batch_id, 1.0):
+                if url in remaining:
+                    collect(url, results)
+                    last_progress = time.monotonic()
+            if remaining and time.monotonic() - last_progress > SCAN_WORK_QUEUE_IDLE_TIMEOUT:
+                print(f"[!] No work queue results for {SCAN_WORK_QUEUE_IDLE_TIMEOUT}s, "
+                      f"giving up on {len(remaining)} URL(s)")
+                for url in list(remaining):
+                    collect(url, [{
+                        "type": "Scan Error",
+                        "url": url,
+                        "module": "workqueue",
+                        "error": f"No worker finished this URL within {SCAN_WORK_QUEUE_IDLE_TIMEOUT}s",
+                        "severity": "Low"
+                    }])
+    finally:
+        await asyncio.to_thread(work_queue.finish_batch, batch_id)
+    return all_results
+
+
+work_queue = None
+work_queue_lock = threading.Lock()
+
+
+def get_work_queue():
+    """The configured work queue, created with its local workers on first use"""
+    global work_queue
+    if SCAN_WORK_QUEUE is None:
+        return None
+    with work_queue_lock:
+        if work_queue is None:
+            queue = create_work_queue(SCAN_WORK_QUEUE)
+            if isinstance(queue, MemoryWorkQueue) and not SCAN_LOCAL_WORKERS:
+                raise ValueError("The memory work queue needs SCAN_LOCAL_WORKERS > 0: "
+                                 "no other process can claim its tasks")
+            work_queue = queue
+            if SCAN_LOCAL_WORKERS:
+                start_local_workers(work_queue, SCAN_LOCAL_WORKERS)
+        return work_queue
+
+
+def crawl_checkpoint_path(target_url):
+    digest = hashlib.sha1(target_url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CRAWL_CHECKPOINT_DIR, f"{digest}.jsonl")
+
+
+active_checkpoints = set()
+active_checkpoints_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def crawl_checkpoint(target_url):
+    """
+    Checkpoint path for crawling `target_url`, held until the crawl ends.
+    A concurrent scan of the same target gets None and crawls without a
+    checkpoint, so two crawls never write or resume the same log.
+    """
+    path = crawl_checkpoint_path(target_url)
+    with active_checkpoints_lock:
+        if path in active_checkpoints:
+            path = None
+        else:
+            active_checkpoints.add(path)
+    try:
+        yield path
+    finally:
+        if path:
+            with active_checkpoints_lock:
+                active_checkpoints.discard(path)
+
+
+def tag_template_results(template, on_results=None):
+    """
+    Results callback marking findings from a template's representative with
+    the template and its member count, so skipped members stay visible.
+    """
+    skipped = len(template["urls"]) - len(template["scanned_urls"])
+
+    def callback(results):
+        if skipped:
+            for result in results:
+                result["template"] = template["template"]
+                result["template_urls_count"] = len(template["urls"])
+        if on_results:
+            on_results(results)
+
+    return callback
 
 
 def get_vulnerability_signature(result):
@@ -84,11 +354,71 @@ def analyze_vulnerabilities(all_results):
     }
 
 
+async def publish_progress(job):
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL)
+        job.publish_progress()
+
+
+def build_scan_data(target_url, crawled_urls, all_results, url_templates=None, endpoints=None, stats=None,
+                    trace=None):
+    vuln_analysis = analyze_vulnerabilities(all_results)
+
+    return {
+        "target": target_url,
+        "discovered_urls": crawled_urls,
+        "url_templates": url_templates or [],
+        "scanned_urls_count": sum(len(t["scanned_urls"]) for t in url_templates or []),
+        "endpoints": endpoints or [],
+        "scan_stats": stats or {},
+        "scan_trace": trace.summary() if trace else {},
+        "total_vulnerabilities": len(all_results),
+        "unique_vulnerabilities": vuln_analysis["unique_count"],
+        "vulnerability_analysis": vuln_analysis,
+        "results": all_results,
+    }
+
+
+def run_scan_job(job):
+    crawled_urls, all_results, url_templates, endpoints, stats, trace = asyncio.run(
+        run_scan(job.target, job=job)
+    )
+    scan_data = build_scan_data(job.target, crawled_urls, all_results, url_templates, endpoints, stats, trace)
+    scan_data["scan_id"] = job.id
+    scan_store.save_scan(job.id, scan_data, created_at=job.created_at)
+    scan_store.save_trace(job.id, trace.to_chrome_trace())
+    return scan_data
+
+
+scan_store = ScanStore(SCAN_STORE_PATH)
+job_manager = JobManager(run_scan_job, max_workers=MAX_CONCURRENT_SCANS, max_jobs=MAX_KEPT_JOBS)
+
+
+def create_scan_metrics():
+    metrics = ScanMetrics()
+    metrics.add_gauge("scanner_job_queue_depth", "Background scans waiting for a free slot",
+                      job_manager.queued_count)
+    metrics.add_gauge("scanner_work_queue_depth", "Per-URL scan tasks waiting for a worker",
+                      lambda: work_queue.pending() if work_queue is not None else None)
+    return metrics.install()
+
+
+scan_metrics = create_scan_metrics() if METRICS_ENABLED else None
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Scanner metrics in the Prometheus text exposition format"""
+    if scan_metrics is None:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(scan_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/scan", methods=["POST"])
 def scan():
     """
     Receive JSON { "url": "<target_url>" }. 
-    Perform the scan in parallel. 
+    Perform the scan concurrently on the async engine. 
     Return the scan_data JSON—no files are written.
     """
     data = request.get_json()
@@ -97,47 +427,172 @@ def scan():
     if not target_url:
         return jsonify({"error": "No URL provided"}), 400
 
-    crawled_urls = crawl_domain(target_url)
-    all_results = []
+    crawled_urls, all_results, url_templates, endpoints, stats, trace = asyncio.run(run_scan(target_url))
+    scan_data = build_scan_data(target_url, crawled_urls, all_results, url_templates, endpoints, stats, trace)
+    scan_data["scan_id"] = uuid.uuid4().hex
+    scan_store.save_scan(scan_data["scan_id"], scan_data)
+    scan_store.save_trace(scan_data["scan_id"], trace.to_chrome_trace())
 
-    # Scan in parallel
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(scan_url, url): url for url in crawled_urls}
-        for future in as_completed(futures):
-            url = futures[future]
-            try:
-                results = future.result()
-                all_results.extend(results)
-            except Exception as e:
-                all_results.append({
-                    "type": "Scan Error",
-                    "url": url,
-                    "error": str(e),
-                    "severity": "Low"
-                })
+    return jsonify(scan_data)
 
-    vuln_analysis = analyze_vulnerabilities(all_results)
 
-    scan_data = {
-        "target": target_url,
-        "discovered_urls": crawled_urls,
-        "total_vulnerabilities": len(all_results),
-        "unique_vulnerabilities": vuln_analysis["unique_count"],
-        "vulnerability_analysis": vuln_analysis,
-        "results": all_results,
-    }
+@app.route("/scans", methods=["GET"])
+def list_scans():
+    """
+    List stored scans, newest first.
+    Optional query params: target, limit (default 50), offset.
+    """
+    limit = min(request.args.get("limit", default=50, type=int), 500)
+    offset = request.args.get("offset", default=0, type=int)
+    scans = scan_store.list_scans(
+        target=request.args.get("target"),
+        limit=max(limit, 1),
+        offset=max(offset, 0),
+    )
+    return jsonify({"scans": scans, "limit": limit, "offset": offset})
 
-    return jsonify(scan_data)
+
+@app.route("/scans", methods=["POST"])
+def create_scan_job():
+    """
+    Receive JSON { "url": "<target_url>" }.
+    Queue the scan on the background worker pool and return its job id
+    immediately (202); poll GET /scans/<id> for progress.
+    """
+    data = request.get_json()
+    target_url = data.get("url")
+
+    if not target_url:
+        return jsonify({"error": "No URL provided"}), 400
+
+    job = job_manager.submit(target_url)
+    return jsonify({
+        "id": job.id,
+        "status": job.status,
+        "status_url": f"/scans/{job.id}",
+    }), 202
+
+
+@app.route("/scans/<job_id>", methods=["GET"])
+def get_scan_job(job_id):
+    """
+    Return status, progress counters and results found so far.
+    Pass ?since=<n> to receive only results after the first n already seen;
+    once completed the response also carries the full scan_data.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        # Not a live job (finished and pruned, or from before a restart)
+        scan_data = scan_store.get_scan(job_id)
+        if scan_data is None:
+            return jsonify({"error": "Scan not found"}), 404
+        return jsonify({
+            "id": job_id,
+            "target": scan_data["target"],
+            "status": "completed",
+            "created_at": scan_data["created_at"],
+            "scan_data": scan_data,
+        })
+
+    since = request.args.get("since", default=0, type=int)
+    return jsonify(job.to_dict(since=max(since, 0)))
+
+
+@app.route("/scans/<scan_id>/findings", methods=["GET"])
+def get_scan_findings(scan_id):
+    """
+    Page through a stored scan's findings.
+    Optional query params: severity, type, signature, limit (default 100), offset.
+    """
+    if scan_store.get_scan(scan_id, include_results=False) is None:
+        return jsonify({"error": "Scan not found"}), 404
+
+    limit = min(request.args.get("limit", default=100, type=int), 1000)
+    offset = request.args.get("offset", default=0, type=int)
+    page = scan_store.get_findings(
+        scan_id,
+        severity=request.args.get("severity"),
+        vuln_type=request.args.get("type"),
+        signature=request.args.get("signature"),
+        limit=max(limit, 1),
+        offset=max(offset, 0),
+    )
+    return jsonify(page)
+
+
+@app.route("/scans/<scan_id>/trace", methods=["GET"])
+def get_scan_trace(scan_id):
+    """
+    Timing trace of a stored scan as Chrome trace-event JSON, for
+    chrome://tracing, Perfetto or speedscope.
+    """
+    trace_events = scan_store.get_trace(scan_id)
+    if trace_events is None:
+        return jsonify({"error": "Trace not found"}), 404
+    return Response(
+        trace_events,
+        mimetype="application/json",
+        headers={"Content-Disposition": f"attachment; filename=scan_{scan_id}_trace.json"},
+    )
+
+
+@app.route("/scans/<job_id>/events", methods=["GET"])
+def stream_scan_job(job_id):
+    """
+    Server-Sent Events stream of a scan job: one `finding` event per result
+    as soon as its check completes, periodic `progress` events, `crawled`
+    once the crawl is done, then `complete` (with the scan_data) or `failed`.
+    Reconnecting clients resume after the Last-Event-ID they received.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Scan not found"}), 404
+
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+    cursor = last_event_id + 1 if last_event_id is not None else 0
+
+    def generate():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        while True:
+            events, finished = job.wait_events(cursor, timeout=STREAM_KEEPALIVE)
+            if not events:
+                if finished:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, event, data in events:
+                yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+            cursor = events[-1][0] + 1
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/download/html", methods=["POST"])
 def download_html():
     """
-    Accept a POST with JSON body: { "scan_data": <the full scan_data JSON> }.
-    Use save_scan_results(...) to generate an HTML file in scan_results/.
-    Then immediately read that HTML file and return it as an attachment.
+    Accept a POST with JSON body: { "scan_id": "<id of a stored scan>" }
+    or { "scan_data": <the full scan_data JSON> }.
+    A stored scan's report is streamed straight into the response as it is
+    rendered. Otherwise use save_scan_results(...) to stream an HTML file
+    into scan_results/, then return that file as an attachment.
     """
     data = request.get_json()
+    scan_id = data.get("scan_id")
+    if scan_id:
+        scan_data = scan_store.get_scan(scan_id)
+        if scan_data is None:
+            return jsonify({"error": "Scan not found"}), 404
+        return Response(
+            stream_with_context(iter_html_report(scan_data, scan_data["target"])),
+            mimetype="text/html",
+            headers={"Content-Disposition": f'attachment; filename="scan_report_{scan_id}.html"'},
+        )
+
     scan_data = data.get("scan_data", None)
 
     if not scan_data:
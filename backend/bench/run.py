@@ -0,0 +1,225 @@
+"""
+Scanner benchmarks against the stand-in target (bench.target): the crawler
+(concurrent, and with one request in flight as the sequential reference),
+scan_url on the target's vulnerable pages, and the full POST /scan flow.
+Each case records wall time, requests/sec, peak threads, peak RSS and
+requests per finding; results are written as JSON and can be compared
+with an earlier run to catch regressions:
+
+    python -m bench.run --output bench_results.json
+    python -m bench.run --compare bench_results.json --latency 20
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from bench.target import MockTarget, TargetConfig, vulnerable_links
+
+# Seconds between thread/RSS samples taken while a case runs
+SAMPLE_INTERVAL = 0.01
+
+# The crawl_domain docstring's claim, checked as concurrent vs sequential crawl time
+CLAIMED_CRAWL_SPEEDUP = (3.0, 5.0)
+
+# A case slower than its baseline by more than this fraction is a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs: the lifetime peak is the best available (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Sampler:
+    """Background thread tracking peak thread count and RSS while a case runs"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        self.peak_threads = max(self.peak_threads, threading.active_count() - 1)  # minus the sampler
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self.thread = threading.Thread(target=self.run, daemon=True, name="bench-sampler")
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
+
+
+def measure(target, func):
+    """Run `func()` (returning (items, findings)) and collect its metrics"""
+    requests_before = target.requests()
+    with Sampler() as sampler:
+        start = time.perf_counter()
+        items, findings = func()
+        wall_time = time.perf_counter() - start
+    requests = target.requests() - requests_before
+    return {
+        "wall_time": round(wall_time, 3),
+        "requests": requests,
+        "requests_per_sec": round(requests / wall_time, 1) if wall_time else None,
+        "peak_threads": sampler.peak_threads,
+        "peak_rss_mb": round(sampler.peak_rss / (1024 * 1024), 1),
+        "items": items,
+        "findings": findings,
+        "requests_per_finding": round(requests / findings, 1) if findings else None,
+    }
+
+
+def bench_crawl(target, max_threads):
+    from scanner.crawler import crawl_domain
+
+    def run():
+        urls = crawl_domain(target.url, max_links=500, max_threads=max_threads,
+                            max_depth=target.config.depth + 1)
+        return len(urls), 0
+    return run
+
+
+def bench_scan_url(target):
+    from app import scan_url
+
+    def run():
+        urls = [target.url.rstrip("/") + link for link in vulnerable_links(target.config)]
+        findings = sum(len(scan_url(url)) for url in urls)
+        return len(urls), findings
+    return run
+
+
+def bench_full_scan(target, work_dir):
+    import app
+    from store import ScanStore
+
+    # Keep checkpoints and stored scans out of the app's own scan_results
+    app.CRAWL_CHECKPOINT_DIR = os.path.join(work_dir, "checkpoints")
+    app.scan_store = ScanStore(os.path.join(work_dir, "scans.db"))
+    client = app.app.test_client()
+
+    def run():
+        response = client.post("/scan", json={"url": target.url})
+        if response.status_code != 200:
+            raise RuntimeError(f"/scan returned {response.status_code}")
+        scan_data = response.get_json()
+        return len(scan_data["discovered_urls"]), len(scan_data["results"])
+    return run
+
+
+def run_benchmarks(config, port, cases):
+    results = {}
+    with MockTarget(config, port) as target, tempfile.TemporaryDirectory() as work_dir:
+        benchmarks = {
+            "crawl": lambda: bench_crawl(target, max_threads=15),
+            "crawl_sequential": lambda: bench_crawl(target, max_threads=1),
+            "scan_url": lambda: bench_scan_url(target),
+            "full_scan": lambda: bench_full_scan(target, work_dir),
+        }
+        for name in cases:
+            print(f"[*] Benchmarking {name}")
+            results[name] = measure(target, benchmarks[name]())
+            print(f"[+] {name}: " + ", ".join(f"{key}={value}" for key, value in results[name].items()))
+    return results
+
+
+def crawl_speedup(cases):
+    """Concurrent vs sequential crawl speedup, checked against the docstring's claim"""
+    if "crawl" not in cases or "crawl_sequential" not in cases:
+        return None
+    speedup = cases["crawl_sequential"]["wall_time"] / cases["crawl"]["wall_time"]
+    low, high = CLAIMED_CRAWL_SPEEDUP
+    return {
+        "speedup": round(speedup, 2),
+        "claimed": f"{low:g}-{high:g}x",
+        "at_least_claimed": speedup >= low,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Print per-case changes from `baseline`; returns the names of cases that regressed"""
+    regressions = []
+    for name, metrics in results["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if not before:
+            continue
+        ratio = metrics["wall_time"] / before["wall_time"] if before["wall_time"] else 1.0
+        regressed = ratio > 1 + tolerance
+        marker = "[!]" if regressed else "[*]"
+        print(f"{marker} {name}: wall {before['wall_time']}s -> {metrics['wall_time']}s ({ratio:.2f}x), "
+              f"requests {before['requests']} -> {metrics['requests']}, "
+              f"findings {before['findings']} -> {metrics['findings']}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawler and scanner against a local mock target")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the results JSON")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed wall time increase over --compare before failing (fraction)")
+    parser.add_argument("--cases", default="crawl,crawl_sequential,scan_url,full_scan")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--reflect-params", type=int, default=3)
+    parser.add_argument("--sql-error-pages", type=int, default=3)
+    parser.add_argument("--sleep-endpoints", type=int, default=1)
+    parser.add_argument("--latency", type=int, default=20, help="milliseconds the target adds to every response")
+    args = parser.parse_args()
+
+    config = TargetConfig(args.depth, args.fanout, args.reflect_params, args.sql_error_pages,
+                          args.sleep_endpoints, args.latency)
+    cases = run_benchmarks(config, args.port, [name.strip() for name in args.cases.split(",") if name.strip()])
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": config.to_dict(),
+        "cases": cases,
+        "crawl_speedup": crawl_speedup(cases),
+    }
+    if results["crawl_speedup"]:
+        speedup = results["crawl_speedup"]
+        print(f"[*] Crawl speedup over sequential: {speedup['speedup']}x (claimed {speedup['claimed']})")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[+] Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[!] Regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
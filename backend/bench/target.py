@@ -0,0 +1,206 @@
+"""
+Stand-in vulnerable target for the benchmarks: a threaded HTTP server with a
+tree of linked pages, parameters that reflect their input, pages leaking SQL
+errors, endpoints that sleep on SLEEP() payloads and optional latency on
+every response. Run on its own with:
+
+    python -m bench.target --port 8765 --depth 3 --fanout 4 --latency 20
+"""
+import argparse
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlparse
+
+SLEEP_PATTERN = re.compile(r"SLEEP\((\d+)\)", re.IGNORECASE)
+
+# Longest SLEEP() honored, so a runaway payload can't stall a benchmark
+MAX_SLEEP = 10
+
+
+class TargetConfig:
+    """Shape of the stand-in site"""
+
+    def __init__(self, depth=3, fanout=4, reflect_params=3, sql_error_pages=3, sleep_endpoints=1, latency_ms=0):
+        self.depth = depth  # levels of the /page tree below the home page
+        self.fanout = fanout  # links from each page to the next level
+        self.reflect_params = reflect_params  # /search{i}.php?q= pages echoing q unescaped
+        self.sql_error_pages = sql_error_pages  # /product{i}.php?id= pages leaking SQL errors on a quote
+        self.sleep_endpoints = sleep_endpoints  # /item{i}.php?id= pages honoring SLEEP(n)
+        self.latency_ms = latency_ms  # added to every response
+
+    def to_args(self):
+        return [
+            "--depth", str(self.depth), "--fanout", str(self.fanout),
+            "--reflect-params", str(self.reflect_params), "--sql-error-pages", str(self.sql_error_pages),
+            "--sleep-endpoints", str(self.sleep_endpoints), "--latency", str(self.latency_ms),
+        ]
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def page_path(trail):
+    return "/page" + "".join(f"/{i}" for i in trail) if trail else "/"
+
+
+def vulnerable_links(config):
+    links = [f"/search{i}.php?q=test" for i in range(config.reflect_params)]
+    links += [f"/product{i}.php?id=1" for i in range(config.sql_error_pages)]
+    links += [f"/item{i}.php?id=1" for i in range(config.sleep_endpoints)]
+    return links
+
+
+class TargetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = TargetConfig()
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def send_html(self, body, status=200, content_type="text/html"):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def count(self):
+        with TargetHandler.lock:
+            TargetHandler.requests += 1
+        if self.config.latency_ms:
+            time.sleep(self.config.latency_ms / 1000)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/__requests":
+            return self.send_html(str(TargetHandler.requests), content_type="text/plain")
+        self.count()
+        self.respond(url.path, parse_qs(url.query))
+
+    def do_POST(self):
+        self.count()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        self.send_html(f"<html><body>Saved {unquote_plus(body)}</body></html>")
+
+    def respond(self, path, query):
+        config = self.config
+        value = " ".join(" ".join(values) for values in query.values())
+
+        if path == "/" or path.startswith("/page"):
+            trail = [int(part) for part in path[len("/page"):].split("/") if part.isdigit()]
+            links = []
+            if len(trail) < config.depth:
+                links = [page_path(trail + [i]) for i in range(config.fanout)]
+            if not trail:
+                links += vulnerable_links(config)
+                form = '<form action="/login.php" method="post"><input name="user"><input name="pass" type="password"></form>'
+            else:
+                form = ""
+            anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+            return self.send_html(f"<html><body><h1>{path}</h1>{anchors}{form}</body></html>")
+
+        if path.startswith("/search"):
+            return self.send_html(f"<html><body>Results for {value}</body></html>")
+        if path.startswith("/product"):
+            if "'" in value:
+                return self.send_html("<html><body>You have an error in your SQL syntax near '1''</body></html>", 500)
+            return self.send_html(f"<html><body>Product {value}</body></html>")
+        if path.startswith("/item"):
+            match = SLEEP_PATTERN.search(value)
+            if match:
+                time.sleep(min(int(match.group(1)), MAX_SLEEP))
+            return self.send_html("<html><body>Item</body></html>")
+        return self.send_html("<html><body>Not found</body></html>", 404)
+
+
+class TargetServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default 5 resets connections under scanner concurrency
+
+    def handle_error(self, request, client_address):
+        # Scanners drop connections they no longer need (cancelled probes)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(port, config):
+    TargetHandler.config = config
+    TargetServer(("127.0.0.1", port), TargetHandler).serve_forever()
+
+
+class MockTarget:
+    """
+    The stand-in target in a child process, so its threads and memory stay
+    out of the benchmarked process's numbers. `requests()` reads how many
+    requests it has served.
+    """
+
+    def __init__(self, config=None, port=8765):
+        self.config = config or TargetConfig()
+        self.port = port
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/"
+
+    def start(self, timeout=10):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "bench.target", "--port", str(self.port)] + self.config.to_args()
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.requests()
+                return self
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError(f"Mock target did not start on port {self.port}")
+                time.sleep(0.1)
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait()
+            self.process = None
+
+    def requests(self):
+        with urllib.request.urlopen(f"{self.url}__requests", timeout=2) as r:
+            return int(r.read())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the benchmark's stand-in vulnerable target")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--reflect-params", type=int, default=3)
+    parser.add_argument("--sql-error-pages", type=int, default=3)
+    parser.add_argument("--sleep-endpoints", type=int, default=1)
+    parser.add_argument("--latency", type=int, default=0, help="milliseconds added to every response")
+    args = parser.parse_args()
+    config = TargetConfig(args.depth, args.fanout, args.reflect_params, args.sql_error_pages,
+                          args.sleep_endpoints, args.latency)
+    try:
+        serve(args.port, config)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
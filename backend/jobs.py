@@ -0,0 +1,159 @@
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class ScanJob:
+    """State and progress of one background scan, readable while it runs"""
+
+    def __init__(self, target):
+        self.id = uuid.uuid4().hex
+        self.target = target
+        self.status = QUEUED
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        # Shared with the scan engine, which bumps the counters as it goes
+        self.stats = {"urls_crawled": 0, "requests_sent": 0, "findings": 0}
+        self.discovered_urls = []
+        self.results = []
+        self.scan_data = None
+        self.lock = threading.Lock()
+        # Ordered event log replayed to every stream subscriber
+        self.events = []
+        self.changed = threading.Condition(self.lock)
+
+    @property
+    def finished(self):
+        return self.status in (COMPLETED, FAILED)
+
+    def add_results(self, results):
+        with self.lock:
+            self.results.extend(results)
+            self.stats["findings"] = len(self.results)
+            for result in results:
+                self._publish("finding", result)
+
+    def set_discovered_urls(self, urls):
+        with self.lock:
+            self.discovered_urls = list(urls)
+            self._publish("crawled", {"discovered_urls": self.discovered_urls})
+
+    def publish_progress(self):
+        with self.lock:
+            self._publish("progress", dict(self.stats))
+
+    def set_status(self, status, error=None):
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.status = status
+            if status == RUNNING:
+                self.started_at = now
+            elif status in (COMPLETED, FAILED):
+                self.finished_at = now
+            if error:
+                self.error = error
+
+            if status == COMPLETED:
+                self._publish("progress", dict(self.stats))
+                self._publish("complete", self.scan_data)
+            elif status == FAILED:
+                self._publish("failed", {"error": self.error})
+            else:
+                self._publish("status", {"status": status})
+
+    def wait_events(self, cursor, timeout=None):
+        """
+        Block until there are events past `cursor` (or `timeout` elapses).
+        Returns the new events and whether the job has finished.
+        """
+        with self.changed:
+            if cursor >= len(self.events) and not self.finished:
+                self.changed.wait(timeout)
+            return self.events[cursor:], self.finished
+
+    def _publish(self, event, data):
+        # Caller holds self.lock
+        self.events.append((len(self.events), event, data))
+        self.changed.notify_all()
+
+    def to_dict(self, since=0):
+        """Status, counters and results from index `since` onwards"""
+        with self.lock:
+            results = self.results[since:]
+        data = {
+            "id": self.id,
+            "target": self.target,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(self.stats),
+            "discovered_urls": list(self.discovered_urls),
+            "results_offset": since,
+            "results": results,
+        }
+        if self.error:
+            data["error"] = self.error
+        if self.scan_data is not None:
+            data["scan_data"] = self.scan_data
+        return data
+
+
+class JobManager:
+    """
+    Runs scans on a background worker pool so the API can return right away.
+
+    `scan_func(job)` performs the scan, updating `job` as it progresses, and
+    returns the final scan_data. Only the newest `max_jobs` jobs are kept.
+    """
+
+    def __init__(self, scan_func, max_workers=4, max_jobs=100):
+        self.scan_func = scan_func
+        self.max_jobs = max_jobs
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan-job")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, target):
+        job = ScanJob(target)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def queued_count(self):
+        """Jobs submitted but not yet started"""
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job.status == QUEUED)
+
+    def _run(self, job):
+        job.set_status(RUNNING)
+        try:
+            job.scan_data = self.scan_func(job)
+        except Exception as e:
+            traceback.print_exc()
+            job.set_status(FAILED, error=str(e))
+        else:
+            job.set_status(COMPLETED)
+
+    def _prune(self):
+        # Drop the oldest finished jobs once over the limit; never running ones
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self.jobs.values() if j.finished][:excess]:
+            del self.jobs[job_id]
@@ -4,50 +4,36 @@ import json
 from datetime import datetime
 from urllib.parse import urlparse
 
-def safe_html_escape(text):
-    """Safely escape HTML content to prevent XSS in reports"""
-    if text is None:
-        return "N/A"
-    return html.escape(str(text), quote=True)
+# Reports are rendered as a stream of chunks: the static sections below
+# plus per-finding markup, joined into pieces of about this many characters
+# so writers see few large writes
+REPORT_CHUNK_SIZE = 64 * 1024
 
-def generate_html_report(scan_data, target_url):
-    """Generate HTML report from scan data with page filtering functionality"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Safely escape the target URL
-    safe_target_url = safe_html_escape(target_url)
-    
-    # Severity color mapping
-    severity_colors = {
-        "Critical": "#dc3545",
-        "High": "#fd7e14", 
-        "Medium": "#ffc107",
-        "Low": "#28a745",
-        "Info": "#17a2b8"
-    }
-    
-    # Get vulnerability analysis
-    vuln_analysis = scan_data.get('vulnerability_analysis', {})
-    total_severity_counts = vuln_analysis.get('total_severity_counts', {})
-    unique_severity_counts = vuln_analysis.get('unique_severity_counts', {})
-    
-    # Get unique URLs from results for filtering
-    unique_urls = set()
-    for result in scan_data.get('results', []):
-        if result.get('url'):
-            unique_urls.add(result['url'])
-    
-    # Sort URLs for consistent display
-    sorted_urls = sorted(list(unique_urls))
-    
-    html_content = f"""
+# Distinct escaped values remembered while rendering one report
+ESCAPE_CACHE_SIZE = 10000
+
+# Severity color mapping
+SEVERITY_COLORS = {
+    "Critical": "#dc3545",
+    "High": "#fd7e14", 
+    "Medium": "#ffc107",
+    "Low": "#28a745",
+    "Info": "#17a2b8"
+}
+DEFAULT_SEVERITY_COLOR = "#6c757d"
+
+# Result fields rendered by the templates themselves rather than as extra "Key: value" lines
+UNIQUE_RESULT_SHOWN_FIELDS = frozenset(['type', 'url', 'severity', 'description', 'error', 'affected_urls', 'affected_urls_count'])
+RESULT_SHOWN_FIELDS = frozenset(['type', 'url', 'severity', 'description', 'error'])
+
+REPORT_HEAD_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <meta http-equiv="Content-Security-Policy" content="default-src 'self'; style-src 'unsafe-inline'; script-src 'unsafe-inline'; object-src 'none'; base-uri 'self'; form-action 'none';">
-        <title>Security Scan Report - {safe_html_escape(target_url)}</title>
+        <title>Security Scan Report - {target}</title>
         <style>
             body {{
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -292,7 +278,7 @@ def generate_html_report(scan_data, target_url):
             <div class="header">
                 <h1>Security Scan Report</h1>
                 <div class="timestamp">Generated on {timestamp}</div>
-                <div style="margin-top: 10px; font-weight: bold; color: #007bff;">Target: {safe_target_url}</div>
+                <div style="margin-top: 10px; font-weight: bold; color: #007bff;">Target: {target}</div>
             </div>
             
             <div class="filter-section">
@@ -300,26 +286,16 @@ def generate_html_report(scan_data, target_url):
                 <div class="filter-controls">
                     <select id="pageFilter" class="filter-select" onchange="filterResults()">
                         <option value="all">All Pages (Show All Results)</option>"""
-    
-    # Add options for each unique URL
-    for url in sorted_urls:
-        safe_url = safe_html_escape(url)
-        # Create a shorter display name for the option
-        display_url = url
-        if len(display_url) > 50:
-            display_url = display_url[:47] + "..."
-        safe_display_url = safe_html_escape(display_url)
-        html_content += f'<option value="{safe_url}">{safe_display_url}</option>'
-    
-    html_content += f"""
+
+SUMMARY_TEMPLATE = """
                     </select>
                 </div>
                 <div class="filter-stats">
                     <div class="filter-stat">
-                        <strong id="visibleResults">{len(scan_data.get('results', []))}</strong> results shown
+                        <strong id="visibleResults">{result_count}</strong> results shown
                     </div>
                     <div class="filter-stat">
-                        <strong id="totalResults">{len(scan_data.get('results', []))}</strong> total results
+                        <strong id="totalResults">{result_count}</strong> total results
                     </div>
                 </div>
             </div>
@@ -327,198 +303,95 @@ def generate_html_report(scan_data, target_url):
             <div class="summary">
                 <div class="summary-card">
                     <h3>Total URLs Scanned</h3>
-                    <div class="value">{len(scan_data.get('discovered_urls', []))}</div>
+                    <div class="value">{url_count}</div>
                 </div>
                 <div class="summary-card">
                     <h3>Total Issues Found</h3>
-                    <div class="value">{scan_data.get('total_vulnerabilities', 0)}</div>
+                    <div class="value">{total_vulnerabilities}</div>
                     <div class="subtitle">All occurrences</div>
                 </div>
                 <div class="summary-card">
                     <h3>Unique Issues Found</h3>
-                    <div class="value">{vuln_analysis.get('unique_count', 0)}</div>
+                    <div class="value">{unique_count}</div>
                     <div class="subtitle">Distinct vulnerability types</div>
                 </div>
                 <div class="summary-card">
                     <h3>Pages with Issues</h3>
-                    <div class="value">{len(sorted_urls)}</div>
+                    <div class="value">{page_count}</div>
                 </div>
             </div>
     """
-    
-    # Add severity summary with tabs for total vs unique
-    if total_severity_counts or unique_severity_counts:
-        html_content += f"""
+
+SEVERITY_SUMMARY_TEMPLATE = """
             <div class="severity-summary">
                 <h2>Issues by Severity</h2>
                 <div class="severity-tabs">
-                    <button class="severity-tab active" onclick="showSeverityView('total')">Total Issues ({scan_data.get('total_vulnerabilities', 0)})</button>
-                    <button class="severity-tab" onclick="showSeverityView('unique')">Unique Issues ({vuln_analysis.get('unique_count', 0)})</button>
+                    <button class="severity-tab active" onclick="showSeverityView('total')">Total Issues ({total_vulnerabilities})</button>
+                    <button class="severity-tab" onclick="showSeverityView('unique')">Unique Issues ({unique_count})</button>
                 </div>
                 
                 <div id="total-severity" class="severity-grid">
         """
-        for severity, count in total_severity_counts.items():
-            color = severity_colors.get(severity, "#6c757d")
-            html_content += f"""
+
+SEVERITY_CARD_TEMPLATE = """
                     <div class="severity-card">
                         <div class="severity-badge" style="background-color: {color};">{severity}</div>
                         <div style="font-size: 20px; font-weight: bold; margin-top: 10px;">{count}</div>
-                        <div style="font-size: 12px; color: #6c757d;">total occurrences</div>
+                        <div style="font-size: 12px; color: #6c757d;">{label}</div>
                     </div>
             """
-        html_content += """
+
+SEVERITY_UNIQUE_START = """
                 </div>
                 
                 <div id="unique-severity" class="severity-grid" style="display: none;">
         """
-        for severity, count in unique_severity_counts.items():
-            color = severity_colors.get(severity, "#6c757d")
-            html_content += f"""
-                    <div class="severity-card">
-                        <div class="severity-badge" style="background-color: {color};">{severity}</div>
-                        <div style="font-size: 20px; font-weight: bold; margin-top: 10px;">{count}</div>
-                        <div style="font-size: 12px; color: #6c757d;">unique types</div>
-                    </div>
-            """
-        html_content += """
+
+COLLAPSIBLE_END = """
                 </div>
             </div>
         """
-    
-    # Add discovered URLs section (collapsible)
-    if scan_data.get('discovered_urls'):
-        html_content += f"""
+
+DISCOVERED_URLS_START_TEMPLATE = """
             <button class="collapsible" onclick="toggleCollapsible(this)">
-                📋 Discovered URLs ({len(scan_data['discovered_urls'])}) - Click to expand
+                📋 Discovered URLs ({url_count}) - Click to expand
             </button>
             <div class="collapsible-content" style="display: none;">
                 <div class="url-list" style="margin: 0; border-radius: 0;">
         """
-        for url in scan_data['discovered_urls']:
-            html_content += f'<div class="url-item">{safe_html_escape(url)}</div>'
-        html_content += """
-                </div>
-            </div>
+
+URL_TEMPLATES_START_TEMPLATE = """
+            <button class="collapsible" onclick="toggleCollapsible(this)">
+                🧩 URL Templates ({template_count} clustered) - Click to expand
+            </button>
+            <div class="collapsible-content" style="display: none;">
+                <div class="url-list" style="margin: 0; border-radius: 0;">
         """
-    
-    # Add results section with unique vulnerabilities
-    html_content += '<div class="results-section"><h2>Detailed Results</h2>'
-    
-    # Show unique vulnerabilities by default
-    unique_results = vuln_analysis.get('unique_results', [])
-    if unique_results:
-        html_content += f'''
+
+URL_TEMPLATE_ITEM_TEMPLATE = """
+                    <div class="url-item"><strong>{template}</strong>
+                        <span class="url-count-badge">{scanned_count} of {url_count} scanned</span>
+                    </div>
+            """
+
+RESULTS_INTRO_TEMPLATE = '''
             <div style="background: #e3f2fd; padding: 15px; border-radius: 8px; margin-bottom: 20px; border-left: 4px solid #2196f3;">
                 <h4 style="margin: 0 0 10px 0; color: #1976d2;">📊 Showing Unique Vulnerabilities</h4>
                 <p style="margin: 0; font-size: 14px; color: #666;">
-                    Displaying {len(unique_results)} unique vulnerability types. Each may affect multiple URLs.
+                    Displaying {unique_count} unique vulnerability types. Each may affect multiple URLs.
                     <button onclick="toggleResultView()" id="toggleViewBtn" style="margin-left: 15px; padding: 5px 10px; background: #2196f3; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 12px;">
-                        Show All Occurrences ({scan_data.get('total_vulnerabilities', 0)})
+                        Show All Occurrences ({total_vulnerabilities})
                     </button>
                 </p>
             </div>
         '''
-        
-        # Unique results view
-        html_content += '<div id="unique-results">'
-        for i, result in enumerate(unique_results):
-            severity = safe_html_escape(result.get('severity', 'Unknown'))
-            result_type = safe_html_escape(result.get('type', 'Unknown Issue'))
-            result_url = safe_html_escape(result.get('url', 'N/A'))
-            color = severity_colors.get(result.get('severity', 'Unknown'), "#6c757d")
-            affected_urls = result.get('affected_urls', [result.get('url', 'N/A')])
-            affected_count = len(affected_urls)
-            
-            html_content += f"""
-                <div class="result-item" data-url="{result_url}" id="unique-result-{i}" style="border-left-color: {color};">
-                    <div class="result-header">
-                        <h3 style="margin: 0;">{result_type} <span class="url-count-badge">{affected_count} page{"s" if affected_count != 1 else ""}</span></h3>
-                        <span class="severity-badge" style="background-color: {color};">{severity}</span>
-                    </div>
-                    <div class="result-body">
-            """
-            
-            # Add description if available (safely escaped)
-            if result.get('description'):
-                safe_description = safe_html_escape(result['description'])
-                html_content += f'<p><strong>Description:</strong> {safe_description}</p>'
-            
-            # Add affected URLs
-            if len(affected_urls) > 1:
-                html_content += f"""
-                        <div class="affected-urls">
-                            <h4>Affected URLs ({len(affected_urls)}):</h4>
-                """
-                for url in affected_urls:
-                    html_content += f'<div class="url-item">{safe_html_escape(url)}</div>'
-                html_content += '</div>'
-            else:
-                html_content += f'<p><strong>URL:</strong> {safe_html_escape(affected_urls[0])}</p>'
-            
-            # Add error if available (safely escaped)
-            if result.get('error'):
-                safe_error = safe_html_escape(result['error'])
-                html_content += f'<p><strong>Error:</strong> {safe_error}</p>'
-            
-            # Add any other fields (safely escaped)
-            for key, value in result.items():
-                if key not in ['type', 'url', 'severity', 'description', 'error', 'affected_urls', 'affected_urls_count']:
-                    safe_key = safe_html_escape(key.title())
-                    safe_value = safe_html_escape(value)
-                    html_content += f'<p><strong>{safe_key}:</strong> {safe_value}</p>'
-            
-            html_content += """
-                    </div>
-                </div>
-            """
-        html_content += '</div>'
-        
-        # All results view (hidden by default)
-        html_content += '<div id="all-results" style="display: none;">'
-        for i, result in enumerate(scan_data.get('results', [])):
-            severity = safe_html_escape(result.get('severity', 'Unknown'))
-            result_type = safe_html_escape(result.get('type', 'Unknown Issue'))
-            result_url = safe_html_escape(result.get('url', 'N/A'))
-            color = severity_colors.get(result.get('severity', 'Unknown'), "#6c757d")
-            
-            html_content += f"""
-                <div class="result-item" data-url="{result_url}" id="all-result-{i}" style="border-left-color: {color};">
-                    <div class="result-header">
-                        <h3 style="margin: 0;">{result_type}</h3>
-                        <span class="severity-badge" style="background-color: {color};">{severity}</span>
-                    </div>
-                    <div class="result-body">
-                        <p><strong>URL:</strong> {result_url}</p>
-            """
-            
-            # Add description if available (safely escaped)
-            if result.get('description'):
-                safe_description = safe_html_escape(result['description'])
-                html_content += f'<p><strong>Description:</strong> {safe_description}</p>'
-            
-            # Add error if available (safely escaped)
-            if result.get('error'):
-                safe_error = safe_html_escape(result['error'])
-                html_content += f'<p><strong>Error:</strong> {safe_error}</p>'
-            
-            # Add any other fields (safely escaped)
-            for key, value in result.items():
-                if key not in ['type', 'url', 'severity', 'description', 'error']:
-                    safe_key = safe_html_escape(key.title())
-                    safe_value = safe_html_escape(value)
-                    html_content += f'<p><strong>{safe_key}:</strong> {safe_value}</p>'
-            
-            html_content += """
+
+RESULT_END = """
                     </div>
                 </div>
             """
-        html_content += '</div>'
-    else:
-        html_content += '<div class="no-results">No security issues found!</div>'
-    
-    # Add JavaScript for filtering and view switching functionality
-    html_content += """
+
+REPORT_TAIL = """
             </div>
         </div>
         
@@ -625,8 +498,219 @@ def generate_html_report(scan_data, target_url):
     </body>
     </html>
     """
-    
-    return html_content
+
+
+def safe_html_escape(text):
+    """Safely escape HTML content to prevent XSS in reports"""
+    if text is None:
+        return "N/A"
+    return html.escape(str(text), quote=True)
+
+
+def _buffered(parts, size=REPORT_CHUNK_SIZE):
+    """Join small string parts into chunks of about `size` characters"""
+    buffer = []
+    buffered = 0
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _escaper():
+    """
+    safe_html_escape with a cache: findings repeat the same URLs, types,
+    severities and payloads, so most values are escaped only once
+    """
+    cache = {}
+
+    def escape(value):
+        text = value if value.__class__ is str else ("N/A" if value is None else str(value))
+        escaped = cache.get(text)
+        if escaped is None:
+            if len(cache) >= ESCAPE_CACHE_SIZE:
+                cache.clear()
+            escaped = cache[text] = html.escape(text, quote=True)
+        return escaped
+    return escape
+
+
+# Per-finding markup is rendered by these functions; their f-strings are
+# compiled with the module, which is cheaper than parsing a template per call
+
+def _render_fields(result, shown_fields, escape):
+    """Every field a template doesn't show itself, as escaped "Key: value" lines"""
+    return "".join(
+        f'<p><strong>{escape(key.title())}:</strong> {escape(value)}</p>'
+        for key, value in result.items() if key not in shown_fields
+    )
+
+
+def _render_unique_result(i, result, escape):
+    severity = escape(result.get('severity', 'Unknown'))
+    color = SEVERITY_COLORS.get(result.get('severity', 'Unknown'), DEFAULT_SEVERITY_COLOR)
+    affected_urls = result.get('affected_urls', [result.get('url', 'N/A')])
+    affected_count = len(affected_urls)
+    parts = [f"""
+                <div class="result-item" data-url="{escape(result.get('url', 'N/A'))}" id="unique-result-{i}" style="border-left-color: {color};">
+                    <div class="result-header">
+                        <h3 style="margin: 0;">{escape(result.get('type', 'Unknown Issue'))} <span class="url-count-badge">{affected_count} page{"s" if affected_count != 1 else ""}</span></h3>
+                        <span class="severity-badge" style="background-color: {color};">{severity}</span>
+                    </div>
+                    <div class="result-body">
+            """]
+    if result.get('description'):
+        parts.append(f'<p><strong>Description:</strong> {escape(result["description"])}</p>')
+    if affected_count > 1:
+        parts.append(f"""
+                        <div class="affected-urls">
+                            <h4>Affected URLs ({affected_count}):</h4>
+                """)
+        parts.extend(f'<div class="url-item">{escape(url)}</div>' for url in affected_urls)
+        parts.append('</div>')
+    else:
+        parts.append(f'<p><strong>URL:</strong> {escape(affected_urls[0])}</p>')
+    if result.get('error'):
+        parts.append(f'<p><strong>Error:</strong> {escape(result["error"])}</p>')
+    parts.append(_render_fields(result, UNIQUE_RESULT_SHOWN_FIELDS, escape))
+    parts.append(RESULT_END)
+    return "".join(parts)
+
+
+def _render_result(i, result, escape):
+    result_url = escape(result.get('url', 'N/A'))
+    color = SEVERITY_COLORS.get(result.get('severity', 'Unknown'), DEFAULT_SEVERITY_COLOR)
+    parts = [f"""
+                <div class="result-item" data-url="{result_url}" id="all-result-{i}" style="border-left-color: {color};">
+                    <div class="result-header">
+                        <h3 style="margin: 0;">{escape(result.get('type', 'Unknown Issue'))}</h3>
+                        <span class="severity-badge" style="background-color: {color};">{escape(result.get('severity', 'Unknown'))}</span>
+                    </div>
+                    <div class="result-body">
+                        <p><strong>URL:</strong> {result_url}</p>
+            """]
+    if result.get('description'):
+        parts.append(f'<p><strong>Description:</strong> {escape(result["description"])}</p>')
+    if result.get('error'):
+        parts.append(f'<p><strong>Error:</strong> {escape(result["error"])}</p>')
+    parts.append(_render_fields(result, RESULT_SHOWN_FIELDS, escape))
+    parts.append(RESULT_END)
+    return "".join(parts)
+
+
+def _render_report(scan_data, target_url):
+    escape = _escaper()
+    results = scan_data.get('results', [])
+    vuln_analysis = scan_data.get('vulnerability_analysis', {})
+    total_severity_counts = vuln_analysis.get('total_severity_counts', {})
+    unique_severity_counts = vuln_analysis.get('unique_severity_counts', {})
+    total_vulnerabilities = scan_data.get('total_vulnerabilities', 0)
+    unique_count = vuln_analysis.get('unique_count', 0)
+    discovered_urls = scan_data.get('discovered_urls', [])
+
+    # Pages with findings, sorted for the filter options
+    sorted_urls = sorted({result['url'] for result in results if result.get('url')})
+
+    yield REPORT_HEAD_TEMPLATE.format(
+        target=escape(target_url),
+        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    for url in sorted_urls:
+        # Shorter display name for the option
+        display_url = url if len(url) <= 50 else url[:47] + "..."
+        yield f'<option value="{escape(url)}">{escape(display_url)}</option>'
+
+    yield SUMMARY_TEMPLATE.format(
+        result_count=len(results),
+        url_count=len(discovered_urls),
+        total_vulnerabilities=total_vulnerabilities,
+        unique_count=unique_count,
+        page_count=len(sorted_urls),
+    )
+
+    # Severity summary with tabs for total vs unique
+    if total_severity_counts or unique_severity_counts:
+        yield SEVERITY_SUMMARY_TEMPLATE.format(total_vulnerabilities=total_vulnerabilities, unique_count=unique_count)
+        for severity, count in total_severity_counts.items():
+            yield SEVERITY_CARD_TEMPLATE.format(color=SEVERITY_COLORS.get(severity, DEFAULT_SEVERITY_COLOR),
+                                                severity=severity, count=count, label="total occurrences")
+        yield SEVERITY_UNIQUE_START
+        for severity, count in unique_severity_counts.items():
+            yield SEVERITY_CARD_TEMPLATE.format(color=SEVERITY_COLORS.get(severity, DEFAULT_SEVERITY_COLOR),
+                                                severity=severity, count=count, label="unique types")
+        yield COLLAPSIBLE_END
+
+    # Discovered URLs (collapsible)
+    if discovered_urls:
+        yield DISCOVERED_URLS_START_TEMPLATE.format(url_count=len(discovered_urls))
+        for url in discovered_urls:
+            yield f'<div class="url-item">{escape(url)}</div>'
+        yield COLLAPSIBLE_END
+
+    # URL templates (collapsible) when near-duplicate URLs were clustered
+    clustered_templates = [t for t in scan_data.get('url_templates', []) if len(t['urls']) > len(t['scanned_urls'])]
+    if clustered_templates:
+        yield URL_TEMPLATES_START_TEMPLATE.format(template_count=len(clustered_templates))
+        for template in clustered_templates:
+            scanned_urls = set(template['scanned_urls'])
+            yield URL_TEMPLATE_ITEM_TEMPLATE.format(
+                template=escape(template['template']),
+                scanned_count=len(template['scanned_urls']),
+                url_count=len(template['urls']),
+            )
+            for url in template['urls']:
+                scanned = " (scanned)" if url in scanned_urls else ""
+                yield f'<div class="url-item" style="padding-left: 20px;">{escape(url)}{scanned}</div>'
+        yield COLLAPSIBLE_END
+
+    # Unique vulnerabilities are shown by default, every occurrence on demand
+    yield '<div class="results-section"><h2>Detailed Results</h2>'
+    unique_results = vuln_analysis.get('unique_results', [])
+    if unique_results:
+        yield RESULTS_INTRO_TEMPLATE.format(unique_count=len(unique_results),
+                                            total_vulnerabilities=total_vulnerabilities)
+        yield '<div id="unique-results">'
+        for i, result in enumerate(unique_results):
+            yield _render_unique_result(i, result, escape)
+        yield '</div>'
+
+        yield '<div id="all-results" style="display: none;">'
+        for i, result in enumerate(results):
+            yield _render_result(i, result, escape)
+        yield '</div>'
+    else:
+        yield '<div class="no-results">No security issues found!</div>'
+
+    yield REPORT_TAIL
+
+
+def iter_html_report(scan_data, target_url):
+    """
+    Render the HTML report (with page filtering) as a stream of string
+    chunks, for a streamed response or file, in time linear in the size
+    of the scan data
+    """
+    return _buffered(_render_report(scan_data, target_url))
+
+
+def generate_html_report(scan_data, target_url):
+    """Generate HTML report from scan data with page filtering functionality"""
+    return "".join(iter_html_report(scan_data, target_url))
+
+
+def write_html_report(scan_data, target_url, path):
+    """Stream the HTML report into the file at `path`; returns the characters written"""
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in iter_html_report(scan_data, target_url):
+            f.write(chunk)
+            written += len(chunk)
+    return written
 
 def save_scan_results(scan_data, target_url):
     """Save scan results to JSON and HTML files"""
@@ -669,10 +753,8 @@ def save_scan_results(scan_data, target_url):
         html_filename = f"{base_filename}.html"
         html_filepath = os.path.join(results_dir, html_filename)
         print(f"Generating HTML report...")  # Debug log
-        html_content = generate_html_report(scan_data, target_url)
-        print(f"HTML content generated, length: {len(html_content)} characters")  # Debug log
-        with open(html_filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        html_length = write_html_report(scan_data, target_url, html_filepath)
+        print(f"HTML content generated, length: {html_length} characters")  # Debug log
         saved_files['html'] = html_filepath
         print(f"HTML file saved: {html_filepath}")  # Debug log
         
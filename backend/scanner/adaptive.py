@@ -0,0 +1,144 @@
+# scanner/adaptive.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the host is shedding load
+OVERLOAD_STATUSES = (429, 503)
+
+# Each full window of successes (one per current slot) adds this many slots
+ADDITIVE_INCREASE = 1.0
+
+# A congestion signal multiplies the host's limit by this
+DECREASE_FACTOR = 0.5
+
+# A response this many times slower than the host's average latency (and
+# at least LATENCY_SPIKE_MIN seconds) counts as a congestion signal
+LATENCY_SPIKE_FACTOR = 3.0
+LATENCY_SPIKE_MIN = 1.0
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_WEIGHT = 0.2
+
+# Longest Retry-After pause honored, in seconds
+MAX_RETRY_AFTER = 60
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostLimiter:
+    """
+    AIMD concurrency limit for one host: the limit grows by one slot per
+    success until the first cut (slow start, doubling per window), then by
+    one slot per window of successes, and is halved on 429/503, timeouts or
+    latency spikes. Signals from requests started before the last cut are
+    ignored, so a burst of failures from one overload cuts only once.
+    Retry-After pauses the host.
+    """
+
+    def __init__(self, host, initial, minimum, maximum):
+        self.host = host
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.latency = None  # moving average, seconds
+        self.last_cut = 0.0
+        self.paused_until = 0.0
+        self.cuts = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            async with self.condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                # Woken by the next release, then the pause and limit are rechecked
+                await self.condition.wait()
+
+    async def release(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_response(self, started, status_code, elapsed, headers=None, expect_slow=False):
+        """Feedback for a request started at monotonic time `started`"""
+        if status_code in OVERLOAD_STATUSES:
+            retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + min(retry_after, MAX_RETRY_AFTER))
+            self._decrease(started, f"HTTP {status_code}")
+            return
+        if not expect_slow:
+            spike = (self.latency is not None and elapsed >= LATENCY_SPIKE_MIN
+                     and elapsed > self.latency * LATENCY_SPIKE_FACTOR)
+            self.latency = elapsed if self.latency is None else (
+                LATENCY_EWMA_WEIGHT * elapsed + (1 - LATENCY_EWMA_WEIGHT) * self.latency
+            )
+            if spike:
+                self._decrease(started, f"latency {elapsed:.1f}s")
+                return
+        increase = ADDITIVE_INCREASE if not self.cuts else ADDITIVE_INCREASE / self.limit
+        self.limit = min(self.maximum, self.limit + increase)
+
+    def on_timeout(self, started):
+        self._decrease(started, "timeout")
+
+    def _decrease(self, started, reason):
+        if started < self.last_cut:
+            return
+        self.last_cut = time.monotonic()
+        old = int(self.limit)
+        self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+        self.cuts += 1
+        logger.info(f"🐢 {self.host}: concurrency {old} → {int(self.limit)} ({reason})")
+
+    def stats(self):
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "cuts": self.cuts,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+        }
+
+
+class AdaptiveLimiter:
+    """Per-host HostLimiters, created on first use with the same bounds"""
+
+    def __init__(self, initial=10, minimum=1, maximum=100):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.hosts = {}
+
+    def host(self, host):
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            limiter = self.hosts[host] = HostLimiter(host, self.initial, self.minimum, self.maximum)
+        return limiter
+
+    def stats(self):
+        return {host: limiter.stats() for host, limiter in self.hosts.items()}
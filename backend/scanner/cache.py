@@ -0,0 +1,130 @@
+# scanner/cache.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from multidict import CIMultiDict, CIMultiDictProxy
+from scanner.engine import Response
+
+
+def _freeze(values):
+    if isinstance(values, dict):
+        return tuple(sorted((str(k), str(v)) for k, v in values.items()))
+    return values
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of fetched responses, shared by the crawler and the
+    scanner modules of one scan so each page is downloaded once.
+
+    Entries beyond `max_entries` / `max_bytes` are evicted least recently
+    used first. With `spill_to_disk=True` evicted entries are written to a
+    temporary directory instead of dropped, and promoted back on a hit.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024, spill_to_disk=False, spill_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.spill_dir = None
+        self.spilled = {}
+        self._owns_spill_dir = False
+        if spill_to_disk or spill_dir:
+            if spill_dir:
+                os.makedirs(spill_dir, exist_ok=True)
+                self.spill_dir = spill_dir
+            else:
+                self.spill_dir = tempfile.mkdtemp(prefix="scan_cache_")
+                self._owns_spill_dir = True
+
+    @staticmethod
+    def key(method, url, params=None, data=None):
+        """Cache key for a request: method, URL (with query params) and body."""
+        return (method.upper(), url, _freeze(params), _freeze(data))
+
+    def __len__(self):
+        return len(self.entries) + len(self.spilled)
+
+    def get(self, key):
+        response = self.entries.get(key)
+        if response is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+        path = self.spilled.pop(key, None)
+        if path is not None:
+            response = self._load(path)
+            if response is not None:
+                self.hits += 1
+                self.put(key, response)
+                return response
+
+        self.misses += 1
+        return None
+
+    def put(self, key, response):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size_bytes -= len(old.text)
+        self.spilled.pop(key, None)
+
+        self.entries[key] = response
+        self.size_bytes += len(response.text)
+
+        while self.entries and (len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            evicted_key, evicted = self.entries.popitem(last=False)
+            self.size_bytes -= len(evicted.text)
+            if self.spill_dir:
+                self.spilled[evicted_key] = self._dump(evicted_key, evicted)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "spilled_entries": len(self.spilled),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        self.entries.clear()
+        self.spilled.clear()
+        self.size_bytes = 0
+        if self._owns_spill_dir and self.spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+
+    def _dump(self, key, response):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        path = os.path.join(self.spill_dir, f"{digest}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": response.url,
+                "status_code": response.status_code,
+                "headers": list(response.headers.items()),
+                "text": response.text,
+                "elapsed": response.elapsed,
+            }, f, ensure_ascii=False)
+        return path
+
+    def _load(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.remove(path)
+        except (OSError, ValueError):
+            return None
+        return Response(
+            url=data["url"],
+            status_code=data["status_code"],
+            headers=CIMultiDictProxy(CIMultiDict(data["headers"])),
+            text=data["text"],
+            elapsed=data["elapsed"],
+        )
@@ -0,0 +1,226 @@
+# scanner/callback.py
+import asyncio
+import concurrent.futures
+import logging
+import os
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Correlation tokens carried by out-of-band payloads, in URL paths or DNS labels
+TOKEN_PATTERN = re.compile(r"oob[0-9a-f]{16}")
+
+# Seconds start() waits for the servers to bind before giving up
+START_TIMEOUT = 10
+
+
+class CallbackListener:
+    """
+    Out-of-band interaction listener for blind SSRF: an HTTP server and an
+    optional DNS responder running on their own thread and event loop, so
+    one listener serves every scan in the process. Each payload carries a
+    token from `register()`; a request or DNS query containing the token
+    resolves it, and scans `wait()` for that from their own loops.
+
+    `public_url` is how targets reach the HTTP server (defaults to
+    http://host:port, which only works for targets on this machine);
+    `dns_domain` is a domain delegated to the DNS responder, if any.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, public_url=None, dns_port=None, dns_domain=None):
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.dns_port = dns_port
+        self.dns_domain = dns_domain
+        self.tokens = {}  # token -> {"url", "param", "future"}
+        self.lock = threading.Lock()
+        self.loop = None
+        self.runner = None
+        self.dns_transport = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None  # exception that stopped the servers from starting
+
+    @property
+    def base_url(self):
+        return (self.public_url or f"http://{self.host}:{self.port}").rstrip("/")
+
+    def start(self, timeout=START_TIMEOUT):
+        """Start the servers; raises what stopped them from binding, or RuntimeError on timeout"""
+        self.thread = threading.Thread(target=self._run, daemon=True, name="callback-listener")
+        self.thread.start()
+        if not self.ready.wait(timeout):
+            raise RuntimeError(f"Callback listener did not start within {timeout}s")
+        if self.error is not None:
+            raise self.error
+        logger.info(f"📡 Callback listener on {self.base_url}" + (f", DNS :{self.dns_port}" if self.dns_transport else ""))
+        return self
+
+    def stop(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def register(self, url, param):
+        """New correlation token for a payload sent to `param` of `url`"""
+        token = f"oob{uuid.uuid4().hex[:16]}"
+        with self.lock:
+            self.tokens[token] = {"url": url, "param": param, "future": concurrent.futures.Future()}
+        return token
+
+    def payloads(self, token):
+        """Payloads carrying `token`: an HTTP URL, plus a DNS name when a domain is delegated"""
+        payloads = [f"{self.base_url}/{token}"]
+        if self.dns_domain:
+            payloads.append(f"http://{token}.{self.dns_domain}/")
+        return payloads
+
+    async def wait(self, token, timeout):
+        """First interaction for `token` within `timeout` seconds, or None"""
+        with self.lock:
+            entry = self.tokens.get(token)
+        if entry is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(entry["future"])), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def release(self, token):
+        with self.lock:
+            self.tokens.pop(token, None)
+
+    def record(self, text, interaction):
+        """Resolve every registered token found in `text` with `interaction`"""
+        for token in TOKEN_PATTERN.findall(text):
+            with self.lock:
+                entry = self.tokens.get(token)
+            if entry is None:
+                logger.info(f"📡 Unmatched {interaction['protocol']} callback for {token}")
+                continue
+            if not entry["future"].done():
+                entry["future"].set_result(dict(interaction, time=time.time()))
+                logger.info(f"📡 {interaction['protocol']} callback for {entry['param']} on {entry['url']}")
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            # Reported by start(); e.g. the port is taken or needs privileges
+            self.error = e
+            if self.runner is not None:
+                self.loop.run_until_complete(self.runner.cleanup())
+            self.loop.close()
+            self.loop = None
+            return
+        finally:
+            self.ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _serve(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle_http)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+        if self.dns_port is not None:
+            self.dns_transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: _DnsResponder(self), local_addr=(self.host, self.dns_port)
+            )
+            self.dns_port = self.dns_transport.get_extra_info("sockname")[1]
+
+    async def _shutdown(self):
+        if self.dns_transport:
+            self.dns_transport.close()
+        await self.runner.cleanup()
+
+    async def _handle_http(self, request):
+        self.record(f"{request.path_qs} {request.host}", {
+            "protocol": "http",
+            "remote": request.remote,
+            "method": request.method,
+            "path": request.path_qs,
+            "user_agent": request.headers.get("User-Agent", ""),
+        })
+        return web.Response(text="ok")
+
+
+class _DnsResponder(asyncio.DatagramProtocol):
+    """Answers every A query with the listener's address and records tokens in the name"""
+
+    def __init__(self, listener):
+        self.listener = listener
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            name, question_end = _parse_question(data)
+        except (IndexError, struct.error, UnicodeDecodeError):
+            return
+        self.listener.record(name.lower(), {"protocol": "dns", "remote": addr[0], "name": name})
+
+        answer_ip = self.listener.host if self.listener.host not in ("0.0.0.0", "") else "127.0.0.1"
+        header = data[:2] + struct.pack(">HHHHH", 0x8180, 1, 1, 0, 0)
+        answer = struct.pack(">HHHIH", 0xC00C, 1, 1, 0, 4) + socket.inet_aton(answer_ip)
+        self.transport.sendto(header + data[12:question_end] + answer, addr)
+
+
+def _parse_question(data):
+    """(query name, offset after the question) of a DNS query packet"""
+    labels = []
+    offset = 12
+    while data[offset]:
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii"))
+        offset += 1 + length
+    return ".".join(labels), offset + 5
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def start_callback_listener(**kwargs):
+    """
+    Start the process-wide listener once; later calls return the running one.
+    Blocks until it has bound its ports, so call it off the event loop. If it
+    can't start, the error is logged and None returned (SSRF then falls back
+    to indicator matching); the next call tries again.
+    """
+    global _listener, _listener_pid
+    with _listener_lock:
+        if get_callback_listener() is None:
+            try:
+                listener = CallbackListener(**kwargs).start()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"⚠️ Callback listener failed to start: {e}")
+                return None
+            _listener = listener
+            _listener_pid = os.getpid()
+        return _listener
+
+
+def get_callback_listener():
+    """
+    The running process-wide listener, or None if none was started in this
+    process (forked workers inherit the object but not its thread)
+    """
+    return _listener if _listener_pid == os.getpid() else None
@@ -0,0 +1,118 @@
+# scanner/checkpoint.py
+import json
+import os
+import time
+
+
+class CrawlState:
+    """Crawl progress rebuilt from a checkpoint log"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.queued = {}  # url -> depth, in scheduling order
+        self.completed = set()  # requested URLs that were fetched (or failed)
+        self.discovered = []  # final URLs of successfully crawled pages
+        self.forms = {}  # final URL -> forms found on that page
+        self.finished = False
+
+    @property
+    def pending(self):
+        """(url, depth) scheduled but never completed, in their original order"""
+        return [(url, depth) for url, depth in self.queued.items() if url not in self.completed]
+
+
+class CrawlCheckpoint:
+    """
+    Append-only JSON-lines log of a crawl: every URL admitted to the
+    frontier, every page completed, and a final marker. Records are
+    buffered and flushed every `flush_every` records or `flush_interval`
+    seconds, so a crash loses at most that window, which is re-fetched.
+    """
+
+    def __init__(self, path, flush_every=50, flush_interval=2.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.file = None
+
+    def load(self, base_url):
+        """State of an unfinished crawl of `base_url`, or None to start afresh"""
+        if not os.path.exists(self.path):
+            return None
+
+        state = None
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash; everything before it is intact
+                    break
+                op = record.get("op")
+                if op == "start":
+                    if record.get("base_url") != base_url:
+                        return None
+                    state = CrawlState(base_url)
+                elif state is None:
+                    return None
+                elif op == "queued":
+                    state.queued.setdefault(record["url"], record["depth"])
+                elif op == "crawled":
+                    state.completed.add(record["url"])
+                    state.discovered.append(record["final_url"])
+                    if record.get("forms"):
+                        state.forms[record["final_url"]] = record["forms"]
+                elif op == "failed":
+                    state.completed.add(record["url"])
+                elif op == "done":
+                    state.finished = True
+
+        if state is None or state.finished:
+            return None
+        return state
+
+    def open(self, base_url, resume_state=None):
+        """Start writing; a fresh crawl truncates the log, a resumed one appends"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "a" if resume_state else "w", encoding="utf-8")
+        if resume_state is None:
+            self._append({"op": "start", "base_url": base_url, "time": time.time()})
+            self.flush()
+
+    def queued(self, url, depth):
+        self._append({"op": "queued", "url": url, "depth": depth})
+
+    def crawled(self, url, final_url, forms=None):
+        record = {"op": "crawled", "url": url, "final_url": final_url}
+        if forms:
+            record["forms"] = forms
+        self._append(record)
+
+    def failed(self, url):
+        self._append({"op": "failed", "url": url})
+
+    def close(self, finished):
+        if self.file is None:
+            return
+        if finished:
+            self._append({"op": "done", "time": time.time()})
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def flush(self):
+        if self.buffer and self.file is not None:
+            self.file.write("".join(self.buffer))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def _append(self, record):
+        self.buffer.append(json.dumps(record) + "\n")
+        if len(self.buffer) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
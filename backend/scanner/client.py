@@ -0,0 +1,76 @@
+# scanner/client.py
+import aiohttp
+from scanner import hooks
+from scanner.adaptive import AdaptiveLimiter
+
+# Statuses worth retrying. Plain 500s are left alone: for injection probes
+# they are usually the target's answer to the payload, not a transient fault.
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class HttpClientConfig:
+    """Connection pool, timeout and retry policy shared by every scanner module."""
+
+    def __init__(self, pool_size=100, per_host_pool_size=0, keepalive_timeout=30,
+                 dns_cache_ttl=300, connect_timeout=3, timeout=10, retries=1,
+                 backoff_factor=0.2, retry_statuses=RETRY_STATUSES, verify_ssl=True,
+                 adaptive=True, initial_host_concurrency=10, min_host_concurrency=1):
+        self.pool_size = pool_size  # total open connections
+        self.per_host_pool_size = per_host_pool_size  # 0 means bounded only by pool_size
+        self.keepalive_timeout = keepalive_timeout  # seconds an idle connection is kept
+        self.dns_cache_ttl = dns_cache_ttl  # seconds a resolved address is reused
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = tuple(retry_statuses)
+        self.verify_ssl = verify_ssl
+        # Per-host AIMD limit (scanner.adaptive) between min_host_concurrency
+        # and the per-host pool size, starting at initial_host_concurrency
+        self.adaptive = adaptive
+        self.initial_host_concurrency = initial_host_concurrency
+        self.min_host_concurrency = min_host_concurrency
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        return self.backoff_factor * (2 ** attempt)
+
+    def client_timeout(self, timeout=None):
+        return aiohttp.ClientTimeout(
+            total=timeout or self.timeout,
+            sock_connect=self.connect_timeout,
+        )
+
+
+def create_connector(config):
+    """Build the pooled, keep-alive, DNS-caching connector for `config`."""
+    return aiohttp.TCPConnector(
+        limit=config.pool_size,
+        limit_per_host=config.per_host_pool_size,
+        keepalive_timeout=config.keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=config.dns_cache_ttl,
+        ssl=config.verify_ssl,
+    )
+
+
+def create_host_limiter(config):
+    """Per-host adaptive limiter for `config`, or None when adaptive limits are off."""
+    if not config.adaptive:
+        return None
+    maximum = config.per_host_pool_size or config.pool_size
+    return AdaptiveLimiter(
+        initial=min(config.initial_host_concurrency, maximum),
+        minimum=config.min_host_concurrency,
+        maximum=maximum,
+    )
+
+
+def create_client_session(config, headers=None):
+    """Create the single HTTP client session a scan's modules share."""
+    return aiohttp.ClientSession(
+        connector=create_connector(config),
+        headers=headers,
+        timeout=config.client_timeout(),
+        trace_configs=list(hooks.SESSION_TRACE_CONFIGS) or None,
+    )
@@ -1,59 +1,63 @@
-import requests
+import asyncio
+import sys
+from collections import deque
 from urllib.parse import urljoin, urlparse, urlunparse
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-import re
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import logging
-import threading
+from scanner import hooks
+from scanner.engine import RequestError, run_sync
+from scanner.extract import extract_html_links, extract_page, extract_js_links, get_parser_backend
+from scanner.checkpoint import CrawlCheckpoint
+from scanner.endpoints import EndpointInventory
+from scanner.seen import SeenSet
+from scanner.trace import span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Non-page resources and paths the crawler never follows
+SKIPPED_EXTENSIONS = ('.pdf', '.doc', '.jpg', '.png', '.gif', '.mp4', '.zip', '.css', '.js')
+SKIPPED_PATTERNS = ('/wp-admin/', '/admin/login', '.xml', '.json')
+SKIPPED_SCHEMES = ('#', 'javascript:', 'mailto:', 'tel:')
+
+# Links kept waiting beyond max_links, as slack for pages that fail to load.
+# Links found while the backlog is full are dropped without being marked
+# seen, so memory stays bounded by max_links rather than by links found.
+BACKLOG_SLACK = 1000
+
+# Bytes a backlog entry costs besides its URL string: the (url, depth)
+# tuple and its deque slot
+BACKLOG_ENTRY_OVERHEAD = sys.getsizeof(("", 0)) + 8
+
 class WebCrawler:
-    def __init__(self, max_links=50, max_threads=20, timeout=5, max_depth=3):
+    def __init__(self, max_links=50, max_threads=20, timeout=5, max_depth=3, parser="auto",
+                 seen_mode="exact", seen_capacity=None, checkpoint_path=None, resume=False, inventory=None):
         self.max_links = max_links
         self.max_threads = max_threads  # Increased from 8
         self.timeout = timeout  # Reduced from 15
         self.max_depth = max_depth
-        self.discovered_urls = set()
-        self.visited_urls = set()
-        self.lock = threading.Lock()
-        
-        # Create session with speed optimizations
-        self.session = requests.Session()
-        
-        # Minimal retry strategy for speed
-        retry_strategy = Retry(
-            total=1,  # Reduced from 2
-            status_forcelist=[429, 500, 502, 503, 504],
-            method_whitelist=["HEAD", "GET", "OPTIONS"],
-            backoff_factor=0.2,  # Reduced from 0.5
-            read=1,  # Reduced from 2
-            connect=1  # Reduced from 2
-        )
-        
-        # Optimized adapter for speed
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=25,  # Increased
-            pool_maxsize=25,  # Increased
-            pool_block=False
-        )
-        
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Link extraction backend from scanner.extract ("auto", "lxml" or "tokenizer")
+        self.parser = parser
+        get_parser_backend(parser)
+        # Seen-set of URL fingerprints ("exact") or a fixed-size Bloom filter
+        # ("bloom"); sized for every link seen, not just the pages crawled
+        self.seen_mode = seen_mode
+        self.seen_capacity = seen_capacity or max(10000, max_links * 20)
+        self.seen_stats = None
+        # Append-only crawl log at checkpoint_path; with resume=True an
+        # unfinished crawl of the same base URL picks up where it stopped
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
+        # Methods, parameters and form fields of crawled pages, for the scanners
+        self.inventory = inventory if inventory is not None else EndpointInventory()
         
         # Minimal headers for speed
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive'
-        })
+            'Accept-Encoding': 'gzip, deflate'
+        }
         
     def normalize_url(self, url):
         """Fast URL normalization"""
@@ -81,65 +85,56 @@ class WebCrawler:
             if parsed.netloc.lower() != base_parsed.netloc.lower():
                 return False
             
-            # Quick extension check - reduced list for speed
+            # Quick extension check
             path_lower = parsed.path.lower()
-            if any(path_lower.endswith(ext) for ext in ['.pdf', '.doc', '.jpg', '.png', '.gif', '.mp4', '.zip', '.css', '.js']):
+            if path_lower.endswith(SKIPPED_EXTENSIONS):
                 return False
             
-            # Quick pattern check - reduced list for speed
-            if any(pattern in path_lower for pattern in ['/wp-admin/', '/admin/login', '.xml', '.json']):
+            # Quick pattern check
+            if any(pattern in path_lower for pattern in SKIPPED_PATTERNS):
                 return False
                 
             return True
         except:
             return False
     
-    def extract_links_from_html(self, soup, base_url):
-        """Optimized HTML link extraction"""
+    def resolve_link(self, raw_url, base_url):
+        """Absolute, normalized in-scope URL for a raw link, or None"""
+        if not raw_url or raw_url.startswith(SKIPPED_SCHEMES):
+            return None
+        try:
+            normalized_url = self.normalize_url(urljoin(base_url, raw_url))
+        except ValueError:
+            return None
+        if self.is_valid_url(normalized_url, base_url):
+            return normalized_url
+        return None
+    
+    def resolve_links(self, raw_links, base_url):
         links = set()
-        
-        # Limit processing for speed
-        for tag in soup.find_all(['a', 'area'], href=True, limit=30):
-            href = tag.get('href', '').strip()
-            if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                full_url = urljoin(base_url, href)
-                normalized_url = self.normalize_url(full_url)
-                if self.is_valid_url(normalized_url, base_url):
-                    links.add(normalized_url)
-        
-        # Quick form extraction - limited for speed
-        for form in soup.find_all('form', action=True, limit=5):
-            action = form.get('action', '').strip()
-            if action and not action.startswith('#'):
-                full_url = urljoin(base_url, action)
-                normalized_url = self.normalize_url(full_url)
-                if self.is_valid_url(normalized_url, base_url):
-                    links.add(normalized_url)
-        
+        for raw_url in raw_links:
+            url = self.resolve_link(raw_url, base_url)
+            if url:
+                links.add(url)
         return links
     
+    def extract_links_from_html(self, html_content, base_url):
+        """Links from a/area href, form action and frame/iframe src, without building a DOM"""
+        return self.resolve_links(extract_html_links(html_content, self.parser), base_url)
+    
+    def extract_page_from_html(self, html_content, base_url):
+        """Links plus the page's forms (method, action, typed fields) from one parse"""
+        raw_links, forms = extract_page(html_content, self.parser)
+        return self.resolve_links(raw_links, base_url), forms
+    
     def extract_links_from_js(self, html_content, base_url):
-        """Fast JavaScript link extraction using regex"""
+        """JavaScript link extraction using a precompiled regex"""
         links = set()
-        
-        # Simplified patterns for speed
-        js_patterns = [
-            r'href\s*:\s*["\']([^"\']+)["\']',
-            r'location\.href\s*=\s*["\']([^"\']+)["\']'
-        ]
-        
-        for pattern in js_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            for match in matches[:10]:  # Limit for speed
-                if match.startswith(('/', 'http://', 'https://')):
-                    try:
-                        full_url = urljoin(base_url, match)
-                        normalized_url = self.normalize_url(full_url)
-                        if self.is_valid_url(normalized_url, base_url):
-                            links.add(normalized_url)
-                    except:
-                        continue
-        
+        for raw_url in extract_js_links(html_content):
+            if raw_url.startswith(('/', 'http://', 'https://')):
+                url = self.resolve_link(raw_url, base_url)
+                if url:
+                    links.add(url)
         return links
     
     def generate_common_paths(self, base_url):
@@ -158,14 +153,15 @@ class WebCrawler:
             
         return links
     
-    def fetch_page(self, url):
-        """Fast page fetching with reduced timeout"""
+    async def fetch_page_async(self, url, engine):
+        """Fetch a page; returns (final URL or None, links, forms)"""
         try:
-            response = self.session.get(
-                url, 
-                timeout=(2, self.timeout),  # Reduced connect timeout
+            response = await engine.get(
+                url,
+                headers=self.headers,
+                timeout=self.timeout,
                 allow_redirects=True,
-                stream=False
+                cache=True
             )
             
             if response.status_code == 200:
@@ -173,152 +169,240 @@ class WebCrawler:
                 content_type = response.headers.get('content-type', '').lower()
                 
                 if any(ct in content_type for ct in ['text/html', 'application/xhtml+xml']):
-                    links = set()
-                    
-                    # Fast HTML parsing
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    html_links = self.extract_links_from_html(soup, final_url)
-                    links.update(html_links)
-                    
-                    # Quick JS extraction
-                    js_links = self.extract_links_from_js(response.text, final_url)
-                    links.update(js_links)
+                    links, forms = self.extract_page_from_html(response.text, final_url)
+                    links.update(self.extract_links_from_js(response.text, final_url))
                     
-                    return final_url, links
+                    return final_url, links, forms
                 else:
-                    return final_url, set()
+                    return final_url, set(), []
             else:
-                return None, set()
+                return None, set(), []
                 
-        except requests.exceptions.Timeout:
-            return None, set()
-        except requests.exceptions.RequestException:
-            return None, set()
+        except RequestError:
+            return None, set(), []
         except Exception:
-            return None, set()
+            return None, set(), []
     
-    def crawl_batch(self, urls_to_crawl, discovered_urls):
-        """High-speed batch crawling"""
-        new_links = set()
-        successful_crawls = 0
+    async def crawl_domain_async(self, base_url, engine):
+        """
+        Pipelined crawl: a shared frontier queue feeds `max_threads` worker
+        coroutines, and links found on a page are queued as soon as that
+        page is parsed, so no depth level waits for its slowest page.
+        Each queued URL carries its own depth; `max_depth` and `max_links`
+        are enforced per URL. With a checkpoint path, admitted and completed
+        URLs are logged so an interrupted crawl can be resumed.
+        """
+        start_time = time.time()
+        base_url = self.normalize_url(base_url)
         
-        # Quick limit check
-        if len(discovered_urls) >= self.max_links:
-            return set()
+        discovered_urls = set()
+        seen_urls = SeenSet(mode=self.seen_mode, capacity=self.seen_capacity)
+        # Links wait in the backlog until admitting them keeps
+        # crawled + queued + in-flight within max_links
+        backlog = deque()
+        backlog_bytes = 0
+        backlog_peak = 0
+        backlog_peak_bytes = 0
+        frontier = asyncio.Queue()
+        in_flight = 0
+        limit_reached = asyncio.Event()
         
-        # Process all URLs in parallel with higher concurrency
-        with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-            future_to_url = {executor.submit(self.fetch_page, url): url for url in urls_to_crawl}
-            
-            # Process results as they complete - much faster than wait()
-            for future in as_completed(future_to_url, timeout=self.timeout + 10):
-                with self.lock:
-                    if len(discovered_urls) >= self.max_links:
-                        # Cancel remaining futures
-                        for f in future_to_url:
-                            if not f.done():
-                                f.cancel()
-                        break
-                
-                original_url = future_to_url[future]
+        checkpoint = None
+        resume_state = None
+        if self.checkpoint_path:
+            checkpoint = CrawlCheckpoint(self.checkpoint_path)
+            if self.resume:
+                resume_state = checkpoint.load(base_url)
+            checkpoint.open(base_url, resume_state)
+        
+        def backlog_push(url, depth):
+            nonlocal backlog_bytes, backlog_peak, backlog_peak_bytes
+            backlog.append((url, depth))
+            backlog_bytes += sys.getsizeof(url) + BACKLOG_ENTRY_OVERHEAD
+            backlog_peak = max(backlog_peak, len(backlog))
+            backlog_peak_bytes = max(backlog_peak_bytes, backlog_bytes)
+        
+        def schedule(url, depth):
+            if depth > self.max_depth:
+                return
+            if len(backlog) + len(discovered_urls) + frontier.qsize() + in_flight >= self.max_links + BACKLOG_SLACK:
+                return
+            if not seen_urls.add(url):
+                return
+            backlog_push(url, depth)
+            if checkpoint:
+                checkpoint.queued(url, depth)
+        
+        def refill():
+            nonlocal backlog_bytes
+            while backlog and len(discovered_urls) + frontier.qsize() + in_flight < self.max_links:
+                url, depth = backlog.popleft()
+                backlog_bytes -= sys.getsizeof(url) + BACKLOG_ENTRY_OVERHEAD
+                frontier.put_nowait((url, depth))
+        
+        async def worker():
+            nonlocal in_flight
+            while True:
+                url, depth = await frontier.get()
+                in_flight += 1
                 try:
-                    final_url, links = future.result()
-                    if final_url:
+                    with span(url, "crawl", depth=depth):
+                        final_url, links, forms = await self.fetch_page_async(url, engine)
+                    if final_url and len(discovered_urls) < self.max_links:
                         discovered_urls.add(final_url)
-                        
-                        remaining_slots = self.max_links - len(discovered_urls)
-                        if remaining_slots > 0:
-                            limited_links = set(list(links)[:remaining_slots])
-                            new_links.update(limited_links)
-                        
-                        successful_crawls += 1
-                        logger.info(f"✓ ({len(discovered_urls)}/{self.max_links}): {final_url} (+{len(links)} links)")
+                        seen_urls.add(final_url)
+                        self.record_endpoints(final_url, forms)
+                        if checkpoint:
+                            checkpoint.crawled(url, final_url, forms)
+                        engine.stats["urls_crawled"] = len(discovered_urls)
+                        logger.info(f"✓ ({len(discovered_urls)}/{self.max_links}) d{depth}: {final_url} (+{len(links)} links)")
                         
                         if len(discovered_urls) >= self.max_links:
-                            break
-                except:
-                    continue
-        
-        logger.info(f"Batch: {successful_crawls}/{len(urls_to_crawl)} successful, {len(new_links)} new links")
-        return new_links
-    
-    def crawl_domain(self, base_url):
-        """Main crawling function - optimized for speed"""
-        start_time = time.time()
-        base_url = self.normalize_url(base_url)
+                            limit_reached.set()
+                    elif not final_url and checkpoint:
+                        checkpoint.failed(url)
+                    if final_url and not limit_reached.is_set():
+                        for link in links:
+                            schedule(link, depth + 1)
+                except Exception:
+                    pass
+                finally:
+                    in_flight -= 1
+                    refill()
+                    frontier.task_done()
         
-        discovered_urls = set()
-        visited_urls = set()
-        
-        # Start with base URL and common paths
-        initial_urls = {base_url}
-        common_urls = self.generate_common_paths(base_url)
-        current_level_urls = initial_urls | common_urls
+        if resume_state:
+            # Rebuild seen-set, results and frontier from the checkpoint
+            for url in resume_state.queued:
+                seen_urls.add(url)
+            for url in resume_state.discovered:
+                discovered_urls.add(url)
+                seen_urls.add(url)
+                self.record_endpoints(url, resume_state.forms.get(url, []))
+            for url, depth in resume_state.pending:
+                backlog_push(url, depth)
+            engine.stats["urls_crawled"] = len(discovered_urls)
+            if len(discovered_urls) >= self.max_links:
+                limit_reached.set()
+            logger.info(f"♻️ RESUMING: {len(discovered_urls)} pages done, {len(backlog)} URLs pending")
+        else:
+            # Start with base URL and common paths
+            schedule(base_url, 0)
+            for url in self.generate_common_paths(base_url):
+                schedule(url, 0)
+        refill()
         
-        logger.info(f"🚀 SPEED CRAWL: {base_url} (Limit: {self.max_links}, Threads: {self.max_threads})")
+        worker_count = max(1, min(self.max_threads, self.max_links))
+        logger.info(f"🚀 SPEED CRAWL: {base_url} (Limit: {self.max_links}, Depth: {self.max_depth}, Workers: {worker_count})")
         
-        for depth in range(self.max_depth + 1):
-            if len(discovered_urls) >= self.max_links:
-                break
-                
-            if not current_level_urls:
-                break
-                
-            logger.info(f"📊 Depth {depth}: {len(current_level_urls)} URLs to process ({len(discovered_urls)}/{self.max_links} found)")
-            
-            # Filter and limit URLs
-            urls_to_crawl = list(current_level_urls - visited_urls)
-            remaining_slots = self.max_links - len(discovered_urls)
-            urls_to_crawl = urls_to_crawl[:remaining_slots]
-            
-            if not urls_to_crawl:
-                break
-            
-            visited_urls.update(urls_to_crawl)
-            
-            # High-speed batch processing
-            new_links = self.crawl_batch(urls_to_crawl, discovered_urls)
-            
-            if len(discovered_urls) >= self.max_links:
-                break
-            
-            # Prepare next level
-            current_level_urls = new_links - visited_urls
+        # Worker tasks copy the current context, so their requests are labeled "crawler"
+        module_token = hooks.current_module.set("crawler")
+        workers = [asyncio.ensure_future(worker()) for _ in range(worker_count)]
+        hooks.current_module.reset(module_token)
+        drained = asyncio.ensure_future(frontier.join())
+        stop = asyncio.ensure_future(limit_reached.wait())
+        finished = False
+        try:
+            await asyncio.wait([drained, stop], return_when=asyncio.FIRST_COMPLETED)
+            finished = True
+        finally:
+            # Cancel workers, including fetches still in flight once the limit is hit
+            for task in workers + [drained, stop]:
+                task.cancel()
+            await asyncio.gather(*workers, drained, stop, return_exceptions=True)
+            if checkpoint:
+                checkpoint.close(finished)
         
         elapsed_time = time.time() - start_time
         result_urls = list(discovered_urls)[:self.max_links]
         
         logger.info(f"✅ COMPLETED in {elapsed_time:.2f}s")
-        logger.info(f"🎯 Found {len(result_urls)} URLs ({len(result_urls)/elapsed_time:.1f} URLs/sec)")
+        logger.info(f"🎯 Found {len(result_urls)} URLs ({len(result_urls)/max(elapsed_time, 1e-6):.1f} URLs/sec)")
         
-        # Cleanup
-        try:
-            self.session.close()
-        except:
-            pass
+        # Per-URL memory covers the seen-set plus the backlog at its largest
+        self.seen_stats = seen_urls.stats()
+        self.seen_stats["seen_memory_bytes"] = self.seen_stats["memory_bytes"]
+        self.seen_stats["backlog_peak"] = backlog_peak
+        self.seen_stats["backlog_peak_bytes"] = backlog_peak_bytes
+        self.seen_stats["memory_bytes"] += backlog_peak_bytes
+        urls = self.seen_stats["urls"]
+        self.seen_stats["bytes_per_url"] = round(self.seen_stats["memory_bytes"] / urls, 1) if urls else 0.0
+        logger.info(
+            f"🧮 Seen-set ({self.seen_stats['mode']}) + backlog: {urls} URLs, "
+            f"{self.seen_stats['memory_bytes']} bytes ({self.seen_stats['bytes_per_url']} B/URL, "
+            f"backlog peak {backlog_peak} URLs / {backlog_peak_bytes} bytes), "
+            f"{self.seen_stats['ns_per_check']} ns/check"
+        )
         
         return result_urls
+    
+    def record_endpoints(self, page_url, forms):
+        self.inventory.add_link(page_url)
+        for form in forms:
+            self.inventory.add_form(form, page_url)
+    
+    def fetch_page(self, url):
+        """Synchronous wrapper around fetch_page_async; returns (final URL or None, links)"""
+        final_url, links, _ = run_sync(self.fetch_page_async, url)
+        return final_url, links
+    
+    # crawl_batch is gone: the pipelined frontier in crawl_domain_async has no batches
+    def crawl_domain(self, base_url):
+        """Synchronous wrapper around crawl_domain_async with its own engine"""
+        return run_sync(self.crawl_domain_async, base_url, concurrency=self.max_threads)
+
+
+async def crawl_domain_async(base_url, engine, max_links=50, timeout=8, max_depth=2, parser="auto",
+                             seen_mode="exact", checkpoint_path=None, resume=False, inventory=None):
+    """
+    Crawl `base_url` on an existing engine, sharing its concurrency limit.
+    Endpoints of crawled pages are added to `inventory` when one is given.
+    """
+    crawler = WebCrawler(
+        max_links=max_links,
+        max_threads=engine.concurrency,
+        timeout=timeout,
+        max_depth=max_depth,
+        parser=parser,
+        seen_mode=seen_mode,
+        checkpoint_path=checkpoint_path,
+        resume=resume,
+        inventory=inventory
+    )
+    
+    return await crawler.crawl_domain_async(base_url, engine)
 
 
-def crawl_domain(base_url, max_links=50, max_threads=15, timeout=8, max_depth=2):
+def crawl_domain(base_url, max_links=50, max_threads=15, timeout=8, max_depth=2, parser="auto",
+                 seen_mode="exact", checkpoint_path=None, resume=False):
     """
     OPTIMIZED domain crawler - much faster than original
     
     Args:
         base_url: Starting URL to crawl
         max_links: Maximum URLs to discover (default: 50)
-        max_threads: Concurrent threads (default: 15, increased from 5)
+        max_threads: Requests in flight at once (default: 15)
         timeout: Request timeout (default: 8s, reduced from 12s)
         max_depth: Crawling depth (default: 2, reduced from 1)
+        parser: Link extraction backend - "auto", "lxml" or "tokenizer"
+        seen_mode: URL dedupe - "exact" fingerprints or fixed-size "bloom"
+        checkpoint_path: Append-only crawl log for crash recovery (default: none)
+        resume: Continue an unfinished crawl logged at checkpoint_path
     
     Returns:
-        List of discovered URLs (3-5x faster than original)
+        List of discovered URLs. `python -m bench.run` measures the crawl
+        against a sequential one (about 13x on its default target, which
+        adds 20 ms to every response)
     """
     crawler = WebCrawler(
         max_links=max_links,
         max_threads=max_threads,
         timeout=timeout,
-        max_depth=max_depth
+        max_depth=max_depth,
+        parser=parser,
+        seen_mode=seen_mode,
+        checkpoint_path=checkpoint_path,
+        resume=resume
     )
     
     return crawler.crawl_domain(base_url)
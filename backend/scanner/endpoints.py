@@ -0,0 +1,152 @@
+# scanner/endpoints.py
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+# Form controls that carry a value but are not worth injecting into
+NON_INJECTABLE_TYPES = ("submit", "button", "reset", "image", "file")
+
+
+def endpoint_base(url):
+    """URL without query string or fragment; endpoints are keyed by it"""
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme, parsed.netloc.lower(), parsed.path or "/", "", "", ""))
+
+
+def query_params(url):
+    """Query parameters of `url` as endpoint params, keeping their values"""
+    return [
+        {"name": name, "type": "query", "value": value}
+        for name, value in parse_qsl(urlparse(url).query, keep_blank_values=True)
+    ]
+
+
+def injectable_params(endpoint, live_only=True):
+    """
+    Params worth injecting into; only the live ones once scanner.liveness has
+    marked them, unless `live_only` is False (for blind, single-request probes)
+    """
+    live = endpoint.get("live") if live_only else None
+    return [
+        param for param in endpoint["params"]
+        if param["type"] not in NON_INJECTABLE_TYPES and (live is None or param["name"] in live)
+    ]
+
+
+def endpoint_values(endpoint, payloads=None):
+    """
+    Request values for every param of `endpoint`, with `payloads` (name ->
+    value) in place. Other params keep their crawled or default value so
+    the request still looks like one the page would send.
+    """
+    payloads = payloads or {}
+    values = {}
+    for param in endpoint["params"]:
+        if param["name"] in payloads:
+            values[param["name"]] = payloads[param["name"]]
+        elif param["type"] not in NON_INJECTABLE_TYPES or param["value"]:
+            values[param["name"]] = param["value"] or "test"
+    return values
+
+
+async def send_payloads(engine, endpoint, payloads, headers=None, timeout=None, expect_slow=False):
+    """
+    Send `payloads` (name -> value) to `endpoint`, in the query string or
+    the form body depending on its method. Returns (request URL, response).
+    """
+    values = endpoint_values(endpoint, payloads)
+    if endpoint["method"] == "POST":
+        return endpoint["url"], await engine.post(endpoint["url"], data=values, headers=headers, timeout=timeout,
+                                                  expect_slow=expect_slow)
+    request_url = f"{endpoint['url']}?{urlencode(values)}"
+    return request_url, await engine.get(endpoint["url"], params=values, headers=headers, timeout=timeout,
+                                         expect_slow=expect_slow)
+
+
+async def send_probe(engine, endpoint, name, payload, headers=None, timeout=None, expect_slow=False):
+    """Send `payload` in param `name` of `endpoint` (none if `name` is None)"""
+    payloads = {name: payload} if name is not None else None
+    return await send_payloads(engine, endpoint, payloads, headers=headers, timeout=timeout,
+                               expect_slow=expect_slow)
+
+
+def endpoints_for_url(url):
+    """Endpoint of a bare URL: a GET with its own query parameters, if any"""
+    params = query_params(url)
+    if not params:
+        return []
+    return [{"method": "GET", "url": endpoint_base(url), "params": params, "source": "link"}]
+
+
+class EndpointInventory:
+    """
+    Endpoints seen while crawling: the method, URL and parameter names of
+    every crawled link and form, with form fields' input types.
+    Endpoints sharing a method and base URL are merged.
+    """
+
+    def __init__(self):
+        self.endpoints = {}  # (method, base url) -> endpoint, in discovery order
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def _merge(self, method, url, params, source):
+        key = (method, endpoint_base(url))
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = {"method": method, "url": key[1], "params": [], "source": source}
+            self.endpoints[key] = endpoint
+        known = {param["name"] for param in endpoint["params"]}
+        for param in params:
+            if param["name"] not in known:
+                known.add(param["name"])
+                endpoint["params"].append(param)
+
+    def add_link(self, url):
+        self._merge("GET", url, query_params(url), "link")
+
+    def add_form(self, form, page_url):
+        """
+        Add a form dict from scanner.extract.PageCollector found on `page_url`.
+        Forms submitting to another host are skipped: they are out of scope.
+        """
+        action = urljoin(page_url, form["action"] or page_url)
+        if urlparse(action).netloc.lower() != urlparse(page_url).netloc.lower():
+            return
+        params = query_params(action) + [
+            {"name": field["name"], "type": field["type"], "value": field["value"]}
+            for field in form["fields"]
+        ]
+        self._merge(form["method"], action, params, "form")
+
+    def for_url(self, url):
+        """
+        Endpoints to test when scanning `url`: a GET with the URL's own query
+        values plus any GET form fields for it, and POST forms submitting to it.
+        """
+        base = endpoint_base(url)
+        params = query_params(url)
+        known = {param["name"] for param in params}
+        form_get = self.endpoints.get(("GET", base))
+        if form_get:
+            params += [param for param in form_get["params"] if param["name"] not in known]
+
+        endpoints = []
+        if params:
+            endpoints.append({"method": "GET", "url": base, "params": params, "source": "link"})
+        post = self.endpoints.get(("POST", base))
+        if post and post["params"]:
+            endpoints.append(post)
+        return endpoints
+
+    def unreached_form_urls(self, urls):
+        """Form action URLs that share no base URL with any of `urls`"""
+        bases = {endpoint_base(url) for url in urls}
+        unreached = []
+        for endpoint in self.endpoints.values():
+            if endpoint["source"] == "form" and endpoint["url"] not in bases:
+                bases.add(endpoint["url"])
+                unreached.append(endpoint["url"])
+        return unreached
+
+    def to_list(self):
+        return list(self.endpoints.values())
@@ -0,0 +1,206 @@
+# scanner/engine.py
+import asyncio
+import time
+from urllib.parse import urlparse
+import aiohttp
+from scanner import hooks
+from scanner.client import HttpClientConfig, create_client_session, create_host_limiter
+from scanner.trace import span
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# One limit for every request in flight across crawler and scanner modules
+DEFAULT_CONCURRENCY = 100
+DEFAULT_TIMEOUT = 10
+
+
+class RequestError(Exception):
+    """Raised when a request fails at the transport level (DNS, connect, timeout)."""
+
+
+class Response:
+    """Fully-read HTTP response, detached from the connection it came from."""
+
+    __slots__ = ("url", "status_code", "headers", "text", "elapsed")
+
+    def __init__(self, url, status_code, headers, text, elapsed):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.elapsed = elapsed
+
+
+class ScanEngine:
+    """
+    Runs the crawler and every scanner check as coroutines on one event loop.
+
+    All requests go through `request()`, which holds a slot of a single
+    semaphore for the duration of the exchange, so `concurrency` bounds the
+    total number of requests in flight no matter how many URLs or checks
+    are scheduled at once. The underlying client session comes from
+    `scanner.client`, so pooling, timeouts and retries follow one policy.
+    Within that limit each host gets an adaptive (AIMD) limit that backs
+    off when the host signals overload, shared by the crawler and checks.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, headers=None,
+                 http_config=None, cache=None, stats=None):
+        self.concurrency = concurrency
+        self.cache = cache
+        # Progress counters; callers may pass a dict they read from elsewhere
+        self.stats = stats if stats is not None else {}
+        self.stats.setdefault("requests_sent", 0)
+        self._pending = {}
+        # State shared by every check on this engine, keyed by name
+        # (e.g. the time-based SQLi lane in scanner.timing)
+        self.lanes = {}
+        self.http_config = http_config or HttpClientConfig(pool_size=concurrency, timeout=timeout)
+        self.timeout = self.http_config.timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self.session = None
+        self.semaphore = None
+        self.limiter = None
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.limiter = create_host_limiter(self.http_config)
+        self.session = create_client_session(self.http_config, headers=self.headers)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    async def request(self, method, url, params=None, data=None, headers=None,
+                      timeout=None, allow_redirects=True, cache=False, expect_slow=False):
+        """
+        Send a request, retrying transport errors and `retry_statuses`
+        responses per the client config. The concurrency slot is released
+        while backing off between attempts.
+
+        With `cache=True` and a response cache attached, an identical earlier
+        request is answered from the cache, and a fresh response is stored
+        under both the requested and the final (post-redirect) URL.
+
+        `expect_slow` marks probes that are slow on purpose (time-based
+        payloads), so their latency is not taken as a sign of overload.
+        """
+        if not cache or self.cache is None:
+            return await self._request(method, url, params, data, headers, timeout, allow_redirects, expect_slow)
+
+        key = self.cache.key(method, url, params, data)
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        # Coalesce identical requests that are already in flight
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(
+            self._request(method, url, params, data, headers, timeout, allow_redirects, expect_slow)
+        )
+        self._pending[key] = pending
+        try:
+            response = await asyncio.shield(pending)
+        finally:
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+        self.cache.put(key, response)
+        if response.url != url and params is None and data is None:
+            self.cache.put(self.cache.key(method, response.url), response)
+        return response
+
+    async def _request(self, method, url, params, data, headers, timeout, allow_redirects, expect_slow=False):
+        config = self.http_config
+        with span(f"{method} {url}", "request", method=method, url=url, params=params or data) as request_span:
+            for attempt in range(config.retries + 1):
+                request_span.attrs["retries"] = attempt
+                try:
+                    response = await self._send(method, url, params, data, headers, timeout, allow_redirects,
+                                                expect_slow)
+                except RequestError:
+                    if attempt >= config.retries:
+                        raise
+                else:
+                    if response.status_code not in config.retry_statuses or attempt >= config.retries:
+                        request_span.attrs["status"] = response.status_code
+                        return response
+                await asyncio.sleep(config.backoff(attempt))
+
+    async def _send(self, method, url, params, data, headers, timeout, allow_redirects, expect_slow=False):
+        if self.limiter is None:
+            return await self._send_now(method, url, params, data, headers, timeout, allow_redirects)
+
+        # The host slot is taken before the global one, so a throttled host
+        # never holds global slots other hosts could use
+        host = self.limiter.host(urlparse(url).netloc)
+        await host.acquire()
+        start_time = time.monotonic()
+        try:
+            response = await self._send_now(method, url, params, data, headers, timeout, allow_redirects)
+        except RequestError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                host.on_timeout(start_time)
+            raise
+        finally:
+            await host.release()
+        host.on_response(start_time, response.status_code, response.elapsed, response.headers, expect_slow)
+        return response
+
+    async def _send_now(self, method, url, params, data, headers, timeout, allow_redirects):
+        client_timeout = self.http_config.client_timeout(timeout)
+        async with self.semaphore:
+            self.stats["requests_sent"] += 1
+            start_time = time.monotonic()
+            try:
+                async with self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    timeout=client_timeout,
+                    allow_redirects=allow_redirects,
+                ) as r:
+                    body = await r.read()
+                    response = Response(
+                        url=str(r.url),
+                        status_code=r.status,
+                        headers=r.headers,
+                        text=body.decode(r.get_encoding(), errors="replace"),
+                        elapsed=time.monotonic() - start_time,
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                for hook in hooks.REQUEST_HOOKS:
+                    hook(method, url, None, time.monotonic() - start_time, 0)
+                raise RequestError(f"{method} {url} failed: {e!r}") from e
+        for hook in hooks.REQUEST_HOOKS:
+            hook(method, url, response.status_code, response.elapsed, len(body))
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+
+def run_sync(coro_func, *args, concurrency=DEFAULT_CONCURRENCY, http_config=None, cache=None, **kwargs):
+    """
+    Run `coro_func(*args, engine=<engine>, **kwargs)` on a fresh event loop.
+
+    This backs the synchronous wrappers kept for callers that predate the
+    async engine; it must not be called from inside a running loop.
+    """
+    async def runner():
+        async with ScanEngine(concurrency=concurrency, http_config=http_config, cache=cache) as engine:
+            return await coro_func(*args, engine=engine, **kwargs)
+
+    return asyncio.run(runner())
@@ -0,0 +1,171 @@
+# scanner/extract.py
+import re
+from html.parser import HTMLParser
+
+# lxml is optional: its C parser is several times faster than the
+# stdlib tokenizer, which is used when lxml is not installed
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Tags whose attribute points at another page
+LINK_ATTRIBUTES = {
+    "a": "href",
+    "area": "href",
+    "form": "action",
+    "frame": "src",
+    "iframe": "src",
+}
+
+# `href: "..."` in object literals and `location.href = "..."` assignments
+JS_LINK_PATTERN = re.compile(
+    r'(?:href\s*:|location\.href\s*=)\s*["\']([^"\']+)["\']',
+    re.IGNORECASE,
+)
+
+
+class LinkCollector:
+    """Receives start/end tag events from a parser backend and keeps link targets"""
+
+    def __init__(self):
+        self.links = []
+
+    def start(self, tag, attrs):
+        attr = LINK_ATTRIBUTES.get(tag)
+        if attr:
+            value = attrs.get(attr)
+            if value:
+                self.links.append(value.strip())
+
+    def end(self, tag):
+        pass
+
+
+class PageCollector(LinkCollector):
+    """
+    LinkCollector that also records each form's method, action and named
+    input/select/textarea fields with their types, for the endpoint inventory
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.forms = []
+        self.form = None
+
+    def start(self, tag, attrs):
+        super().start(tag, attrs)
+        if tag == "form":
+            method = (attrs.get("method") or "get").strip().upper()
+            self.form = {
+                "method": "POST" if method == "POST" else "GET",
+                "action": (attrs.get("action") or "").strip(),
+                "fields": [],
+            }
+            self.forms.append(self.form)
+        elif self.form is not None and tag in ("input", "select", "textarea", "button"):
+            name = attrs.get("name")
+            if not name:
+                return
+            if tag == "input":
+                field_type = (attrs.get("type") or "text").strip().lower()
+            elif tag == "button":
+                field_type = (attrs.get("type") or "submit").strip().lower()
+            else:
+                field_type = tag
+            self.form["fields"].append({"name": name, "type": field_type, "value": attrs.get("value") or ""})
+
+    def end(self, tag):
+        if tag == "form":
+            self.form = None
+
+
+class _TokenizerParser(HTMLParser):
+    """Streams stdlib tokenizer events to a collector without building a tree"""
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, {name: value or "" for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+
+class _LxmlTarget:
+    """lxml parser target: forwards events, so no element tree is ever built"""
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    def start(self, tag, attrib):
+        self.collector.start(tag, attrib)
+
+    def end(self, tag):
+        self.collector.end(tag)
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return None
+
+
+def _parse_with_tokenizer(html_content, collector):
+    parser = _TokenizerParser(collector)
+    parser.feed(html_content)
+    parser.close()
+
+
+def _parse_with_lxml(html_content, collector):
+    parser = etree.HTMLParser(target=_LxmlTarget(collector), recover=True)
+    try:
+        parser.feed(html_content)
+        parser.close()
+    except etree.Error:
+        # Keep whatever was collected before the parser gave up
+        pass
+
+
+PARSER_BACKENDS = {
+    "tokenizer": _parse_with_tokenizer,
+}
+if etree is not None:
+    PARSER_BACKENDS["lxml"] = _parse_with_lxml
+
+
+def get_parser_backend(name="auto"):
+    """Resolve a backend name; "auto" picks lxml when available"""
+    if name == "auto":
+        name = "lxml" if "lxml" in PARSER_BACKENDS else "tokenizer"
+    try:
+        return PARSER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown HTML parser backend '{name}' (available: {', '.join(PARSER_BACKENDS)})")
+
+
+def parse_html(html_content, collector, backend="auto"):
+    """Feed `html_content` through the chosen backend into `collector`"""
+    get_parser_backend(backend)(html_content, collector)
+    return collector
+
+
+def extract_html_links(html_content, backend="auto"):
+    """Raw href/action/src values of link-bearing tags, in document order"""
+    return parse_html(html_content, LinkCollector(), backend).links
+
+
+def extract_page(html_content, backend="auto"):
+    """Raw link values and forms of a page, from one parse"""
+    collector = parse_html(html_content, PageCollector(), backend)
+    return collector.links, collector.forms
+
+
+def extract_js_links(html_content):
+    """Raw URLs assigned to href properties in inline JavaScript"""
+    return JS_LINK_PATTERN.findall(html_content)
@@ -1,4 +1,5 @@
-import requests
+from scanner.engine import run_sync
+from scanner.modules import register_module
 
 # Expanded headers list from your JSON report
 SECURITY_HEADERS = {
@@ -17,9 +18,12 @@ INFO_DISCLOSURE_HEADERS = {
     "X-Powered-By": "X-Powered-By header reveals server information"
 }
 
-def scan_security_headers(url):
+# One request per URL, usually answered from the crawler's cache
+@register_module("headers", inputs=("page", "headers"), cost_per_url=1)
+async def scan_security_headers_async(url, engine):
     try:
-        r = requests.get(url, timeout=10)
+        # Usually answered from the crawler's cached copy of the page
+        r = await engine.get(url, cache=True)
         headers = r.headers
         findings = []
 
@@ -54,3 +58,7 @@ def scan_security_headers(url):
         return findings
     except Exception as e:
         return [{"error": f"Failed to fetch URL: {str(e)}"}]
+
+
+def scan_security_headers(url):
+    return run_sync(scan_security_headers_async, url)
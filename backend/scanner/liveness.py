@@ -0,0 +1,67 @@
+# scanner/liveness.py
+import asyncio
+import hashlib
+import uuid
+from scanner.endpoints import injectable_params, send_probe
+from scanner.engine import RequestError
+from scanner.matcher import PatternMatcher
+
+
+def response_fingerprint(r, canary=None):
+    """Status plus a digest of the body, with any reflected canary removed"""
+    text = r.text
+    if canary:
+        text = text.replace(canary, "")
+    return r.status_code, hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=16).digest()
+
+
+async def find_live_params(endpoint, engine, headers=None):
+    """
+    Names of the injectable params of `endpoint` that influence the response.
+    Two baseline requests fingerprint the page; then each param gets one
+    request with a random canary and is live if the canary is reflected or
+    the fingerprint changes. Pages that differ between the two baselines
+    (timestamps, tokens) can't be judged this way, so all params stay live.
+    """
+    names = [param["name"] for param in injectable_params(endpoint)]
+    if not names:
+        return []
+    try:
+        baselines = await asyncio.gather(
+            send_probe(engine, endpoint, None, None, headers=headers),
+            send_probe(engine, endpoint, None, None, headers=headers),
+        )
+    except RequestError:
+        return names
+    baseline, again = (response_fingerprint(r) for _, r in baselines)
+    if baseline != again:
+        return names
+
+    async def is_live(name):
+        canary = f"cn{uuid.uuid4().hex[:10]}"
+        try:
+            _, r = await send_probe(engine, endpoint, name, canary, headers=headers)
+        except RequestError:
+            return True
+        reflected = PatternMatcher([canary]).search(r.text) is not None
+        return reflected or response_fingerprint(r, canary) != baseline
+
+    live = await asyncio.gather(*(is_live(name) for name in names))
+    return [name for name, is_param_live in zip(names, live) if is_param_live]
+
+
+async def mark_live_params(endpoints, engine, headers=None):
+    """
+    Copies of `endpoints` restricted to their live params (see
+    injectable_params), counting params kept and skipped in engine.stats
+    """
+    live_lists = await asyncio.gather(*(find_live_params(endpoint, engine, headers) for endpoint in endpoints))
+    marked = []
+    for endpoint, live in zip(endpoints, live_lists):
+        total = len(injectable_params(endpoint))
+        engine.stats["params_live"] = engine.stats.get("params_live", 0) + len(live)
+        engine.stats["params_skipped"] = engine.stats.get("params_skipped", 0) + total - len(live)
+        if total > len(live):
+            print(f"[*] Skipping {total - len(live)} param(s) with no effect on {endpoint['method']} {endpoint['url']}")
+        marked.append(dict(endpoint, live=live))
+    return marked
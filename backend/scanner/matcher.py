@@ -0,0 +1,38 @@
+# scanner/matcher.py
+
+
+class PatternMatcher:
+    """
+    Set of literal indicators prepared once and matched case-insensitively
+    against a response body with a single lowercased copy of it. Every
+    response check goes through it: SQL errors, SSRF indicators, XSS payload
+    reflections, batched XSS canaries and the pre-probe's canary.
+
+    For the handful of indicators per set, one C-level str.find per indicator
+    stopping at the first hit beats a combined alternation regex over the
+    lowered text (2-3x slower when nothing matches, the common case), an
+    IGNORECASE regex (~20x slower) and an Aho-Corasick automaton.
+    """
+
+    def __init__(self, indicators):
+        self.indicators = list(dict.fromkeys(indicators))
+        self.lowered = [(indicator.lower(), indicator) for indicator in self.indicators]
+
+    def search(self, text):
+        """First indicator, in set order, found in `text` as evidence {"indicator", "offset"}, or None"""
+        text_lower = text.lower()
+        for lowered, indicator in self.lowered:
+            offset = text_lower.find(lowered)
+            if offset >= 0:
+                return {"indicator": indicator, "offset": offset}
+        return None
+
+    def find_all(self, text):
+        """Evidence for every indicator found in `text`, in set order"""
+        text_lower = text.lower()
+        found = []
+        for lowered, indicator in self.lowered:
+            offset = text_lower.find(lowered)
+            if offset >= 0:
+                found.append({"indicator": indicator, "offset": offset})
+        return found
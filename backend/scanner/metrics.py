@@ -0,0 +1,210 @@
+# scanner/metrics.py
+import threading
+import time
+from urllib.parse import urlparse
+import aiohttp
+from scanner import hooks
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        for label_values, value in items:
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down, or is read from `function()` at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def samples(self):
+        if self.function is None:
+            yield from super().samples()
+            return
+        value = self.function()
+        if value is not None:
+            yield self.name, "", value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, label_values=()):
+        with self.lock:
+            counts = self.values.get(label_values)
+            if counts is None:
+                counts = self.values[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[len(self.buckets)] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self.lock:
+            items = sorted((key, list(counts)) for key, counts in self.values.items())
+        names = self.labels + ("le",)
+        for label_values, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(names, label_values + (bound,)), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labels, label_values), counts[-1]
+            yield f"{self.name}_count", _format_labels(self.labels, label_values), cumulative
+
+
+class ScanMetrics:
+    """
+    Scanner metrics in the Prometheus text format, fed through the hooks in
+    scanner.hooks. Nothing is recorded until `install()` registers them.
+    """
+
+    def __init__(self):
+        self.http_requests = Counter(
+            "scanner_http_requests_total", "HTTP requests sent, by module, host and status",
+            ("module", "host", "status"),
+        )
+        self.http_latency = Histogram(
+            "scanner_http_request_duration_seconds", "HTTP request latency, by module", ("module",),
+        )
+        self.http_bytes = Counter(
+            "scanner_http_received_bytes_total", "Response body bytes received, by module and host",
+            ("module", "host"),
+        )
+        self.pool_checkouts = Counter(
+            "scanner_pool_checkouts_total", "Connections taken from the pool, new or reused", ("kind",),
+        )
+        self.pool_waits = Histogram(
+            "scanner_pool_wait_seconds", "Time requests waited for a free pooled connection",
+        )
+        self.active_scans = Gauge("scanner_active_scans", "Scans currently running")
+        self.active_scans.inc((), 0)
+        self.findings = Counter("scanner_findings_total", "Findings reported, by type", ("type",))
+        self.metrics = [
+            self.http_requests, self.http_latency, self.http_bytes,
+            self.pool_checkouts, self.pool_waits, self.active_scans, self.findings,
+        ]
+        self.trace_config = self._trace_config()
+        self.installed = False
+
+    def add_gauge(self, name, help, function):
+        """Gauge read from `function()` at scrape time (skipped while it returns None)"""
+        self.metrics.append(Gauge(name, help, function=function))
+
+    def install(self):
+        if self.installed:
+            return self
+        hooks.REQUEST_HOOKS.append(self.on_request)
+        hooks.FINDING_HOOKS.append(self.on_findings)
+        hooks.SCAN_HOOKS.append(self.on_scan)
+        hooks.SESSION_TRACE_CONFIGS.append(self.trace_config)
+        self.installed = True
+        return self
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        hooks.REQUEST_HOOKS.remove(self.on_request)
+        hooks.FINDING_HOOKS.remove(self.on_findings)
+        hooks.SCAN_HOOKS.remove(self.on_scan)
+        hooks.SESSION_TRACE_CONFIGS.remove(self.trace_config)
+        self.installed = False
+
+    def on_request(self, method, url, status, elapsed, body_bytes):
+        module = hooks.current_module.get() or "other"
+        host = urlparse(url).netloc
+        self.http_requests.inc((module, host, str(status) if status is not None else "error"))
+        self.http_latency.observe(elapsed, (module,))
+        if body_bytes:
+            self.http_bytes.inc((module, host), body_bytes)
+
+    def on_findings(self, results):
+        for result in results:
+            self.findings.inc((result.get("type", "unknown"),))
+
+    def on_scan(self, delta):
+        self.active_scans.inc((), delta)
+
+    def _trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_queued_start(session, ctx, params):
+            ctx.queued_at = time.monotonic()
+
+        async def on_queued_end(session, ctx, params):
+            self.pool_waits.observe(time.monotonic() - ctx.queued_at)
+
+        async def on_create_end(session, ctx, params):
+            self.pool_checkouts.inc(("new",))
+
+        async def on_reuse(session, ctx, params):
+            self.pool_checkouts.inc(("reused",))
+
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        trace_config.freeze()
+        return trace_config
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
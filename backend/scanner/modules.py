@@ -0,0 +1,77 @@
+# scanner/modules.py
+import importlib
+
+# Check modules imported by load_modules(); each registers itself with
+# @register_module, so a new check is added here and nowhere else
+MODULE_IMPORTS = (
+    "scanner.headers",
+    "scanner.injection",
+    "scanner.ssrf",
+)
+
+# Inputs a module can declare. "page" and "headers" come from the URL's own
+# response; "params" and "forms" are GET query and POST form endpoints from
+# the crawler's inventory, and modules needing them are skipped without any.
+INPUTS = ("page", "headers", "params", "forms")
+
+
+class ScanModule:
+    """
+    A registered check: `run(url, engine)`, or `run(url, engine, endpoints)`
+    when it needs params or forms, returning a list of findings.
+    `cost_per_url` and `cost_per_param` estimate the requests it sends, and
+    `concurrency` caps how many URLs it scans at once (None for no cap).
+    """
+
+    def __init__(self, name, run, inputs, cost_per_url=0, cost_per_param=0, concurrency=None):
+        unknown = set(inputs) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown module inputs {sorted(unknown)} (expected some of {', '.join(INPUTS)})")
+        self.name = name
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.cost_per_url = cost_per_url
+        self.cost_per_param = cost_per_param
+        self.concurrency = concurrency
+
+    @property
+    def needs_endpoints(self):
+        return "params" in self.inputs or "forms" in self.inputs
+
+    def usable_endpoints(self, endpoints):
+        """The endpoints of the kinds this module takes"""
+        methods = set()
+        if "params" in self.inputs:
+            methods.add("GET")
+        if "forms" in self.inputs:
+            methods.add("POST")
+        return [endpoint for endpoint in endpoints if endpoint["method"] in methods]
+
+    def applies(self, endpoints):
+        """Whether the module has anything to work on for a URL with these endpoints"""
+        if "page" in self.inputs or "headers" in self.inputs:
+            return True
+        return bool(self.usable_endpoints(endpoints))
+
+    def estimate(self, endpoints):
+        """Estimated requests for one URL"""
+        params = sum(len(endpoint["params"]) for endpoint in self.usable_endpoints(endpoints))
+        return self.cost_per_url + self.cost_per_param * params
+
+
+MODULES = {}
+
+
+def register_module(name, inputs, cost_per_url=0, cost_per_param=0, concurrency=None):
+    """Decorator registering an async check function as scan module `name`"""
+    def decorator(run):
+        MODULES[name] = ScanModule(name, run, inputs, cost_per_url, cost_per_param, concurrency)
+        return run
+    return decorator
+
+
+def load_modules():
+    """Every registered module, cheapest per URL first"""
+    for module_name in MODULE_IMPORTS:
+        importlib.import_module(module_name)
+    return sorted(MODULES.values(), key=lambda module: (module.cost_per_url, module.cost_per_param))
@@ -0,0 +1,47 @@
+# scanner/probes.py
+import asyncio
+
+# Payloads of one (endpoint, parameter, vulnerability class) in flight at once.
+# Small enough that a hit on an early payload saves most of the rest; the
+# many groups of a scan still keep the engine's concurrency busy.
+PROBES_PER_GROUP = 3
+
+
+async def run_until_confirmed(probes, concurrency=PROBES_PER_GROUP):
+    """
+    Run probe coroutine factories, `concurrency` at a time, until one returns
+    a finding. Queued probes are never started and in-flight ones are
+    cancelled once a finding is confirmed; the finding records how many
+    probes were sent and skipped. Returns the finding or None.
+    """
+    probes = list(probes)
+    pending = set()
+    next_probe = 0
+    completed = 0
+    finding = None
+    try:
+        while finding is None and (pending or next_probe < len(probes)):
+            while next_probe < len(probes) and len(pending) < concurrency:
+                pending.add(asyncio.ensure_future(probes[next_probe]()))
+                next_probe += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                completed += 1
+                if finding is None and task.result():
+                    finding = task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    if finding is not None:
+        finding["probes_sent"] = completed
+        finding["probes_skipped"] = len(probes) - completed
+    return finding
+
+
+async def run_probe_groups(groups, concurrency=PROBES_PER_GROUP):
+    """Findings of every group (a list of probe factories), groups run concurrently"""
+    results = await asyncio.gather(*(run_until_confirmed(probes, concurrency) for probes in groups))
+    return [finding for finding in results if finding]
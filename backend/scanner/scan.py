@@ -0,0 +1,107 @@
+# scanner/scan.py
+import asyncio
+from scanner import hooks
+from scanner.endpoints import endpoints_for_url
+from scanner.liveness import mark_live_params
+from scanner.modules import load_modules
+from scanner.trace import span
+
+# Pre-probe each parameter with a canary and skip the response-matching
+# payload sets (error-based SQLi, XSS, SSRF indicators) for parameters that
+# neither reflect it nor change the response. Blind probes (time-based SQLi,
+# out-of-band SSRF) still cover every parameter; blind SSRF without the
+# callback listener is missed in such params.
+PREPROBE_PARAMS = True
+
+
+async def scan_urls_async(urls, engine, endpoints_for=None, on_results=None):
+    """
+    Run every registered module (scanner.modules) against every URL as one
+    schedule of (module, URL) units. Units start cheapest first by their
+    module's estimated request cost, so cheap checks across all URLs get
+    engine slots before expensive ones, and each module's concurrency cap
+    limits how many URLs it works on at once.
+
+    `endpoints_for(url)` gives the inventory entries to inject into
+    (EndpointInventory.for_url; by default a URL's own query). If given,
+    `on_results(url, results)` is called as each unit finishes.
+    """
+    endpoints_for = endpoints_for or endpoints_for_url
+    modules = load_modules()
+    limits = {
+        module.name: asyncio.Semaphore(module.concurrency) if module.concurrency else None
+        for module in modules
+    }
+    live_endpoints = {}  # url -> task running the parameter pre-probe, shared by modules
+    results = []
+
+    async def preprobe(url, endpoints):
+        hooks.current_module.set("preprobe")
+        with span(f"preprobe {url}", "preprobe", url=url):
+            return await mark_live_params(endpoints, engine)
+
+    async def prepare(url, endpoints):
+        if not PREPROBE_PARAMS:
+            return endpoints
+        if url not in live_endpoints:
+            live_endpoints[url] = asyncio.ensure_future(preprobe(url, endpoints))
+        return await live_endpoints[url]
+
+    async def run_unit(module, url, endpoints):
+        # Each unit is its own task, so this labels only its own requests
+        hooks.current_module.set(module.name)
+        try:
+            if module.needs_endpoints:
+                endpoints = await prepare(url, endpoints)
+                args = (url, engine, module.usable_endpoints(endpoints))
+            else:
+                args = (url, engine)
+            limit = limits[module.name]
+            if limit:
+                async with limit:
+                    with span(f"{module.name} {url}", "module", module=module.name, url=url):
+                        unit_results = await module.run(*args)
+            else:
+                with span(f"{module.name} {url}", "module", module=module.name, url=url):
+                    unit_results = await module.run(*args)
+        except Exception as e:
+            unit_results = [{
+                "type": "Scan Error",
+                "url": url,
+                "module": module.name,
+                "error": str(e),
+                "severity": "Low"
+            }]
+        results.extend(unit_results)
+        for hook in hooks.FINDING_HOOKS:
+            hook(unit_results)
+        if on_results:
+            on_results(url, unit_results)
+
+    units = []
+    for url in urls:
+        endpoints = endpoints_for(url)
+        for module in modules:
+            if module.applies(endpoints):
+                units.append((module.estimate(endpoints), module, url, endpoints))
+    units.sort(key=lambda unit: unit[0])
+
+    # Tasks start in creation order, so the cheapest units queue for the engine first
+    await asyncio.gather(*(asyncio.ensure_future(run_unit(module, url, endpoints))
+                           for _, module, url, endpoints in units))
+    return results
+
+
+async def scan_url_async(url, engine, on_results=None, endpoints=None):
+    """
+    Run every check against `url`. If given, `on_results` is called with
+    each check's findings as soon as that check finishes. `endpoints` are
+    the inventory entries to inject into for this URL; by default only its
+    own query is used.
+    """
+    return await scan_urls_async(
+        [url],
+        engine,
+        endpoints_for=(lambda _: endpoints) if endpoints is not None else None,
+        on_results=(lambda _, results: on_results(results)) if on_results else None,
+    )
@@ -0,0 +1,166 @@
+# scanner/seen.py
+import hashlib
+import math
+import sys
+import time
+from array import array
+
+
+def url_fingerprint(url):
+    """64-bit fingerprint of a URL; stored instead of the URL string itself"""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class FingerprintSet:
+    """
+    Exact seen-set of 64-bit URL fingerprints in an open-addressing table
+    backed by one flat array, so each URL costs 16-32 bytes rather than a
+    string plus a set slot. Collisions are ~n²/2⁶⁵, i.e. negligible.
+    """
+
+    mode = "exact"
+
+    def __init__(self, initial_size=1024):
+        size = 1
+        while size < initial_size:
+            size <<= 1
+        self.table = array("Q", bytes(8 * size))  # 0 marks an empty slot
+        self.mask = size - 1
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, fingerprint):
+        # Linear probing; returns (index, found)
+        table, mask = self.table, self.mask
+        i = fingerprint & mask
+        while True:
+            value = table[i]
+            if value == 0:
+                return i, False
+            if value == fingerprint:
+                return i, True
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old = self.table
+        self.table = array("Q", bytes(16 * len(old)))
+        self.mask = len(self.table) - 1
+        for fingerprint in old:
+            if fingerprint:
+                self.table[self._slot(fingerprint)[0]] = fingerprint
+
+    def __contains__(self, url):
+        return self._slot(url_fingerprint(url) or 1)[1]
+
+    def add(self, url):
+        """Add `url`; True if it was not seen before"""
+        if (self.count + 1) * 2 > len(self.table):
+            self._grow()
+        fingerprint = url_fingerprint(url) or 1
+        i, found = self._slot(fingerprint)
+        if found:
+            return False
+        self.table[i] = fingerprint
+        self.count += 1
+        return True
+
+    def memory_bytes(self):
+        return sys.getsizeof(self.table)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` URLs at `error_rate` false
+    positives. Memory never grows; past `capacity` the false-positive rate
+    rises, so some new URLs are wrongly treated as seen and skipped.
+    """
+
+    mode = "bloom"
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _positions(self, url):
+        # Double hashing: k positions from two independent 64-bit halves
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, url):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def add(self, url):
+        """Add `url`; True if it was (probably) not seen before"""
+        new = False
+        for p in self._positions(url):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def memory_bytes(self):
+        return sys.getsizeof(self.bits)
+
+
+class SeenSet:
+    """
+    URL seen-set used by the crawler frontier, with O(1) admission checks
+    and per-URL cost accounting.
+
+    mode="exact" keeps 64-bit fingerprints; mode="bloom" uses a fixed-size
+    Bloom filter for bounded memory on very large crawls.
+    """
+
+    def __init__(self, mode="exact", capacity=100000, error_rate=0.001):
+        if mode == "exact":
+            self.backend = FingerprintSet()
+        elif mode == "bloom":
+            self.backend = BloomFilter(capacity=capacity, error_rate=error_rate)
+        else:
+            raise ValueError(f"Unknown seen-set mode '{mode}' (expected 'exact' or 'bloom')")
+        self.checks = 0
+        self.check_seconds = 0.0
+
+    @property
+    def mode(self):
+        return self.backend.mode
+
+    def __len__(self):
+        return len(self.backend)
+
+    def __contains__(self, url):
+        return url in self.backend
+
+    def add(self, url):
+        """Admission check: add `url` and return True if it is new"""
+        start = time.perf_counter()
+        new = self.backend.add(url)
+        self.check_seconds += time.perf_counter() - start
+        self.checks += 1
+        return new
+
+    def stats(self):
+        count = len(self.backend)
+        memory = self.backend.memory_bytes()
+        return {
+            "mode": self.mode,
+            "urls": count,
+            "checks": self.checks,
+            "memory_bytes": memory,
+            "bytes_per_url": round(memory / count, 1) if count else 0.0,
+            "ns_per_check": round(self.check_seconds / self.checks * 1e9) if self.checks else 0,
+        }
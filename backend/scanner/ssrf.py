@@ -1,7 +1,12 @@
 # scanner/ssrf.py
-import requests
-import concurrent.futures
-from urllib.parse import urlparse, urljoin
+import asyncio
+from functools import partial
+from scanner.callback import get_callback_listener
+from scanner.endpoints import endpoints_for_url, injectable_params, send_probe
+from scanner.engine import RequestError, run_sync
+from scanner.matcher import PatternMatcher
+from scanner.modules import register_module
+from scanner.probes import run_probe_groups
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (VulnScanner)"
@@ -14,53 +19,122 @@ SSRF_PAYLOADS = [
     "http://internal.example.com", "http://localhost:80/admin"
 ]
 
-# Parameters often vulnerable to SSRF
-COMMON_PARAM_NAMES = [
-    "url", "uri", "path", "target", "dest", "redirect", "next", "data", "resource"
-]
+# Response content suggesting the server fetched an internal resource
+SSRF_INDICATORS = ["meta-data", "hostname", "root:x", "127.0.0.1", "localhost"]
+SSRF_MATCHER = PatternMatcher(SSRF_INDICATORS)
+
+# Seconds to wait for an out-of-band callback once a parameter's payloads are sent
+CALLBACK_WAIT = 5
 
 
-def test_ssrf(target_url, param, payload):
-    session = requests.Session()
-    session.headers.update(HEADERS)
+async def test_ssrf_async(endpoint, param, payload, engine):
     try:
-        r = session.get(target_url, params={param: payload}, timeout=10, allow_redirects=True)
-        lower_body = r.text.lower()
+        url, r = await send_probe(engine, endpoint, param, payload, headers=HEADERS)
+        evidence = SSRF_MATCHER.search(r.text)
 
-        if any(indicator in lower_body for indicator in ["meta-data", "hostname", "root:x", "127.0.0.1", "localhost"]):
+        if evidence:
             return {
                 "type": "SSRF",
-                "url": r.url,
+                "url": url,
+                "method": endpoint["method"],
                 "parameter": param,
                 "payload": payload,
                 "status_code": r.status_code,
                 "severity": "High",
-                "description": f"Potential SSRF via parameter '{param}' using payload '{payload}'"
+                "description": f"Potential SSRF via parameter '{param}' using payload '{payload}'",
+                "evidence": evidence
             }
 
-    except requests.exceptions.RequestException as e:
-        print(f"[!] SSRF test failed on {target_url} with param '{param}' and payload '{payload}': {e}")
-    finally:
-        session.close()
+    except RequestError as e:
+        print(f"[!] SSRF test failed on {endpoint['url']} with param '{param}' and payload '{payload}': {e}")
 
     return None
 
 
+async def test_ssrf_oob_async(endpoint, param, listener, engine):
+    """
+    Send the callback listener's payloads for a fresh token to `param` and
+    report SSRF if the target calls back within CALLBACK_WAIT seconds
+    """
+    token = listener.register(endpoint["url"], param)
+    payloads = listener.payloads(token)
+    sent = {}
+
+    async def send(payload):
+        try:
+            sent[payload], _ = await send_probe(engine, endpoint, param, payload, headers=HEADERS)
+        except RequestError as e:
+            print(f"[!] SSRF callback probe failed on {endpoint['url']} with param '{param}': {e}")
 
-def scan_ssrf(target_url):
+    try:
+        await asyncio.gather(*(send(payload) for payload in payloads))
+        if not sent:
+            return None
+        interaction = await listener.wait(token, CALLBACK_WAIT)
+    finally:
+        listener.release(token)
+
+    if interaction:
+        # The HTTP payload comes first; the DNS one, if any, last
+        payload = payloads[0] if interaction["protocol"] == "http" else payloads[-1]
+        return {
+            "type": "SSRF (Out-of-Band)",
+            "url": sent.get(payload, endpoint["url"]),
+            "method": endpoint["method"],
+            "parameter": param,
+            "payload": payload,
+            "severity": "High",
+            "description": f"Server fetched an out-of-band callback URL sent in parameter '{param}'",
+            "evidence": interaction
+        }
+    return None
+
+
+# Per parameter: up to len(SSRF_PAYLOADS) probes, or 1-2 with the callback listener
+@register_module("ssrf", inputs=("params", "forms"), cost_per_param=8, concurrency=25)
+async def scan_ssrf_async(target_url, engine, endpoints=None):
+    """
+    With a callback listener running (scanner.callback), send one tokenized
+    callback payload per real parameter of `endpoints` and wait for the target
+    to call back; this also covers params the pre-probe found inert, since
+    blind SSRF does not change the response. Otherwise try SSRF_PAYLOADS and
+    match SSRF_INDICATORS in responses, stopping per parameter at the first
+    finding.
+    """
     print(f"[*] Starting SSRF scan on: {target_url}")
-    results = []
-    futures = []
+    if endpoints is None:
+        endpoints = endpoints_for_url(target_url)
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        for param in COMMON_PARAM_NAMES:
-            for payload in SSRF_PAYLOADS:
-                futures.append(executor.submit(test_ssrf, target_url, param, payload))
+    listener = get_callback_listener()
+    if listener is not None:
+        results = [
+            result for result in await asyncio.gather(*(
+                test_ssrf_oob_async(endpoint, param["name"], listener, engine)
+                for endpoint in endpoints
+                for param in injectable_params(endpoint, live_only=False)
+            ))
+            if result
+        ]
+        for result in results:
+            print(f"[+] SSRF vulnerability found: {result}")
+        return results
 
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                print(f"[+] SSRF vulnerability found: {result}")
-                results.append(result)
+    groups = [
+        [partial(test_ssrf_async, endpoint, param["name"], payload, engine) for payload in SSRF_PAYLOADS]
+        for endpoint in endpoints
+        for param in injectable_params(endpoint)
+    ]
+
+    results = await run_probe_groups(groups)
+    for result in results:
+        print(f"[+] SSRF vulnerability found: {result}")
 
     return results
+
+
+def test_ssrf(endpoint, param, payload):
+    return run_sync(test_ssrf_async, endpoint, param, payload)
+
+
+def scan_ssrf(target_url, endpoints=None):
+    return run_sync(scan_ssrf_async, target_url, endpoints=endpoints)
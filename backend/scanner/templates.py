@@ -0,0 +1,36 @@
+# scanner/templates.py
+from urllib.parse import parse_qsl, urlparse
+
+
+def url_template(url):
+    """
+    Canonical template of a URL: scheme, host and path plus the sorted set
+    of query parameter names, e.g. http://host/product.php?id=*
+    """
+    parsed = urlparse(url)
+    names = sorted({name for name, _ in parse_qsl(parsed.query, keep_blank_values=True)})
+    template = f"{parsed.scheme}://{parsed.netloc.lower()}{parsed.path or '/'}"
+    if names:
+        template += "?" + "&".join(f"{name}=*" for name in names)
+    return template
+
+
+def cluster_urls(urls, representatives=2):
+    """
+    Group URLs by template and pick up to `representatives` members of
+    each group to scan (all of them if `representatives` is falsy).
+    Returns one dict per template, in first-seen order.
+    """
+    clusters = {}
+    for url in urls:
+        clusters.setdefault(url_template(url), []).append(url)
+
+    result = []
+    for template, members in clusters.items():
+        members = sorted(members)
+        result.append({
+            "template": template,
+            "urls": members,
+            "scanned_urls": members[:representatives] if representatives else members,
+        })
+    return result
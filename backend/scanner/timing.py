@@ -0,0 +1,111 @@
+# scanner/timing.py
+import asyncio
+from urllib.parse import urlparse
+from scanner.endpoints import send_probe
+from scanner.engine import RequestError
+
+# Seconds the time-based payloads ask the database to sleep
+SLEEP_SECONDS = 3
+
+# Time-based probes in flight at once per engine. Each one holds an engine
+# slot for SLEEP_SECONDS or more, so they get their own small lane and the
+# fast payloads keep the rest of the engine's concurrency.
+TIME_BASED_CONCURRENCY = 4
+
+# Benign requests timed per host before its first time-based probe
+BASELINE_SAMPLES = 3
+
+# Delayed/control probe pairs that must all agree before a finding is reported
+CONFIRMATIONS = 2
+
+# A probe counts as delayed when it is this fraction of SLEEP_SECONDS
+# slower than the host's slowest baseline sample
+DELAY_FACTOR = 0.8
+
+# Seconds allowed on top of the baseline and the requested sleep
+TIMEOUT_MARGIN = 5
+
+
+class TimingLane:
+    """
+    Scheduling lane for time-based probes: its own concurrency cap plus the
+    latency baseline of each host, measured once and shared by every probe.
+    """
+
+    def __init__(self, concurrency=TIME_BASED_CONCURRENCY):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.baselines = {}  # host -> task resolving to baseline seconds or None
+
+    async def baseline(self, engine, endpoint, headers=None):
+        """Slowest of BASELINE_SAMPLES benign requests to the endpoint's host"""
+        host = urlparse(endpoint["url"]).netloc
+        task = self.baselines.get(host)
+        if task is None:
+            task = asyncio.ensure_future(self._measure(engine, endpoint, headers))
+            self.baselines[host] = task
+        return await asyncio.shield(task)
+
+    async def _measure(self, engine, endpoint, headers):
+        samples = []
+        for _ in range(BASELINE_SAMPLES):
+            elapsed = await self.time(engine, endpoint, None, None, headers)
+            if elapsed is None:
+                return None
+            samples.append(elapsed)
+        return max(samples)
+
+    async def time(self, engine, endpoint, name, payload, headers=None, timeout=None):
+        """
+        Response time of one probe sent through the lane, None if it failed.
+        Lane probes are slow by design, so they don't feed the host's
+        adaptive limit latency signal.
+        """
+        async with self.semaphore:
+            try:
+                _, r = await send_probe(engine, endpoint, name, payload, headers=headers, timeout=timeout,
+                                        expect_slow=True)
+            except RequestError:
+                return None
+        return r.elapsed
+
+
+def get_timing_lane(engine):
+    lane = engine.lanes.get("time-based")
+    if lane is None:
+        lane = engine.lanes["time-based"] = TimingLane()
+    return lane
+
+
+async def confirm_delay(engine, endpoint, name, payload_template, headers=None):
+    """
+    Whether `payload_template` (with a `{delay}` placeholder) delays the
+    response: CONFIRMATIONS times, the payload with SLEEP_SECONDS must be
+    slower than the host baseline by DELAY_FACTOR * SLEEP_SECONDS while the
+    same payload with a zero delay is not. Returns evidence or None.
+    """
+    lane = get_timing_lane(engine)
+    baseline = await lane.baseline(engine, endpoint, headers)
+    if baseline is None:
+        return None
+    threshold = baseline + SLEEP_SECONDS * DELAY_FACTOR
+    timeout = baseline + SLEEP_SECONDS + TIMEOUT_MARGIN
+
+    delayed_times = []
+    control_times = []
+    for _ in range(CONFIRMATIONS):
+        delayed = await lane.time(engine, endpoint, name, payload_template.format(delay=SLEEP_SECONDS),
+                                  headers, timeout)
+        if delayed is None or delayed < threshold:
+            return None
+        control = await lane.time(engine, endpoint, name, payload_template.format(delay=0), headers, timeout)
+        if control is None or control >= threshold:
+            return None
+        delayed_times.append(round(delayed, 3))
+        control_times.append(round(control, 3))
+
+    return {
+        "baseline_seconds": round(baseline, 3),
+        "threshold_seconds": round(threshold, 3),
+        "delayed_seconds": delayed_times,
+        "control_seconds": control_times,
+    }
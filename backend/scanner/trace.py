@@ -0,0 +1,204 @@
+# scanner/trace.py
+import asyncio
+import contextvars
+import time
+
+# Entries in each top-N list of the summary attached to scan results
+SUMMARY_TOP_N = 10
+
+# Span the current task's work belongs to; None when no scan is being traced
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed piece of a scan: a stage, a crawled page, a module run on a URL or a request"""
+
+    __slots__ = ("name", "category", "attrs", "parent", "trace", "start", "end", "lane")
+
+    def __init__(self, name, category, attrs, parent, trace):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.parent = parent
+        self.trace = trace
+        self.start = time.perf_counter()
+        self.end = None
+        self.lane = trace.lane()
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def ancestor(self, category):
+        span = self.parent
+        while span is not None and span.category != category:
+            span = span.parent
+        return span
+
+
+class _SpanContext:
+    def __init__(self, name, category, attrs, parent):
+        self.span = Span(name, category, attrs, parent, parent.trace)
+        self.token = None
+
+    def __enter__(self):
+        self.token = current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.end = time.perf_counter()
+        if exc_type is not None and exc_type is not asyncio.CancelledError:
+            span.attrs["error"] = exc_type.__name__
+        span.trace.spans.append(span)
+        current_span.reset(self.token)
+
+
+class _NoSpan:
+    """Stand-in returned by span() when nothing is traced; attribute writes go nowhere"""
+
+    attrs = {}
+
+    def __enter__(self):
+        self.attrs = {}
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, category, **attrs):
+    """
+    Context manager timing `name` as a child of the current span. Child
+    tasks copy the context, so spans they open nest under it. Outside a
+    traced scan it does nothing.
+    """
+    parent = current_span.get()
+    if parent is None:
+        return _NO_SPAN
+    return _SpanContext(name, category, attrs, parent)
+
+
+class ScanTrace:
+    """
+    Span tree of one scan. `activate()` makes it the current trace for the
+    calling task and every task started under it. Scans handed to worker
+    processes are only traced up to the work queue.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.spans = []  # finished spans, in the order they ended
+        self.lanes = {}  # asyncio task -> Chrome trace thread id
+        self.root = Span(target, "scan", {}, None, self)
+
+    def lane(self):
+        # Spans opened by one task never overlap, so each task is one track
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return self.lanes.setdefault(id(task) if task else None, len(self.lanes))
+
+    def activate(self):
+        return _RootContext(self)
+
+    def summary(self, top_n=SUMMARY_TOP_N):
+        """Compact timings: stages, crawl depths, modules, and the slowest URLs and requests"""
+        stages = {}
+        depths = {}
+        modules = {}
+        urls = {}
+        requests = []
+        for span in self.spans:
+            if span.category == "stage":
+                stages[span.name] = round(span.duration, 3)
+            elif span.category == "crawl":
+                depth = depths.setdefault(span.attrs.get("depth", 0), {"pages": 0, "seconds": 0.0,
+                                                                       "start": span.start, "end": span.end})
+                depth["pages"] += 1
+                depth["seconds"] += span.duration
+                depth["start"] = min(depth["start"], span.start)
+                depth["end"] = max(depth["end"], span.end)
+            elif span.category == "module":
+                name = span.attrs["module"]
+                module = modules.setdefault(name, {"units": 0, "seconds": 0.0})
+                module["units"] += 1
+                module["seconds"] += span.duration
+                url = urls.setdefault(span.attrs["url"], {"start": span.start, "end": span.end, "modules": {}})
+                url["start"] = min(url["start"], span.start)
+                url["end"] = max(url["end"], span.end)
+                url["modules"][name] = round(span.duration, 3)
+            elif span.category == "request":
+                requests.append(span)
+
+        slowest_urls = sorted(urls.items(), key=lambda item: item[1]["end"] - item[1]["start"], reverse=True)
+        slowest_requests = sorted(requests, key=lambda span: span.duration, reverse=True)
+        return {
+            "total_seconds": round(self.root.duration, 3),
+            "stages": stages,
+            "crawl_depths": [
+                {"depth": d, "pages": depth["pages"], "seconds": round(depth["seconds"], 3),
+                 "wall_seconds": round(depth["end"] - depth["start"], 3)}
+                for d, depth in sorted(depths.items())
+            ],
+            "modules": {
+                name: {"units": module["units"], "seconds": round(module["seconds"], 3)}
+                for name, module in sorted(modules.items())
+            },
+            "requests": len(requests),
+            "retries": sum(span.attrs.get("retries", 0) for span in requests),
+            "slowest_urls": [
+                {"url": url, "seconds": round(data["end"] - data["start"], 3), "modules": data["modules"]}
+                for url, data in slowest_urls[:top_n]
+            ],
+            "slowest_requests": [
+                dict(
+                    span.attrs,
+                    module=_module_of(span),
+                    seconds=round(span.duration, 3),
+                )
+                for span in slowest_requests[:top_n]
+            ],
+        }
+
+    def to_chrome_trace(self):
+        """The span tree as Chrome trace-event JSON (chrome://tracing, Perfetto, speedscope)"""
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": f"scan {self.target}"}}]
+        for span in [self.root] + self.spans:
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.root.start) * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": 1,
+                "tid": span.lane,
+                "args": span.attrs,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class _RootContext:
+    def __init__(self, trace):
+        self.trace = trace
+        self.token = None
+
+    def __enter__(self):
+        self.token = current_span.set(self.trace.root)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.root.end = time.perf_counter()
+        current_span.reset(self.token)
+
+
+def _module_of(span):
+    owner = span.ancestor("module")
+    if owner is not None:
+        return owner.attrs["module"]
+    owner = span.ancestor("crawl") or span.ancestor("preprobe")
+    return owner.category if owner is not None else None
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from components import get_vulnerability_signature
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    total_vulnerabilities INTEGER NOT NULL,
+    unique_vulnerabilities INTEGER NOT NULL,
+    url_count INTEGER NOT NULL,
+    analysis TEXT NOT NULL,
+    url_templates TEXT NOT NULL DEFAULT '[]',
+    endpoints TEXT NOT NULL DEFAULT '[]',
+    stats TEXT NOT NULL DEFAULT '{}',
+    trace_summary TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_scans_target ON scans (target, created_at);
+CREATE INDEX IF NOT EXISTS idx_scans_created ON scans (created_at);
+
+CREATE TABLE IF NOT EXISTS urls (
+    scan_id TEXT NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_scan ON urls (scan_id);
+
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id TEXT NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    url TEXT,
+    type TEXT,
+    severity TEXT,
+    signature TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_scan ON findings (scan_id, id);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings (scan_id, severity);
+CREATE INDEX IF NOT EXISTS idx_findings_type ON findings (scan_id, type);
+CREATE INDEX IF NOT EXISTS idx_findings_signature ON findings (signature);
+
+-- Chrome trace-event JSON of each scan, kept apart so scan reads don't load it
+CREATE TABLE IF NOT EXISTS traces (
+    scan_id TEXT PRIMARY KEY REFERENCES scans (id) ON DELETE CASCADE,
+    data TEXT NOT NULL
+);
+"""
+
+# Columns added after the first release, created on older databases at startup
+ADDED_COLUMNS = {
+    "scans": [
+        ("url_templates", "TEXT NOT NULL DEFAULT '[]'"),
+        ("endpoints", "TEXT NOT NULL DEFAULT '[]'"),
+        ("stats", "TEXT NOT NULL DEFAULT '{}'"),
+        ("trace_summary", "TEXT NOT NULL DEFAULT '{}'"),
+    ],
+}
+
+
+class ScanStore:
+    """SQLite store of completed scans, their discovered URLs and findings"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            for table, columns in ADDED_COLUMNS.items():
+                existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for name, definition in columns:
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def _connect(self):
+        # One connection per thread; Flask and the job workers each get their own
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+        return conn
+
+    def save_scan(self, scan_id, scan_data, created_at=None):
+        results = scan_data.get('results', [])
+        discovered_urls = scan_data.get('discovered_urls', [])
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scans (id, target, created_at, total_vulnerabilities,"
+                " unique_vulnerabilities, url_count, analysis, url_templates, endpoints, stats, trace_summary)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    scan_id,
+                    scan_data.get('target', ''),
+                    created_at or datetime.now().isoformat(),
+                    scan_data.get('total_vulnerabilities', len(results)),
+                    scan_data.get('unique_vulnerabilities', 0),
+                    len(discovered_urls),
+                    json.dumps(scan_data.get('vulnerability_analysis', {})),
+                    json.dumps(scan_data.get('url_templates', [])),
+                    json.dumps(scan_data.get('endpoints', [])),
+                    json.dumps(scan_data.get('scan_stats', {})),
+                    json.dumps(scan_data.get('scan_trace', {})),
+                ),
+            )
+            conn.execute("DELETE FROM urls WHERE scan_id = ?", (scan_id,))
+            conn.execute("DELETE FROM findings WHERE scan_id = ?", (scan_id,))
+            conn.executemany(
+                "INSERT INTO urls (scan_id, url) VALUES (?, ?)",
+                ((scan_id, url) for url in discovered_urls),
+            )
+            conn.executemany(
+                "INSERT INTO findings (scan_id, url, type, severity, signature, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        scan_id,
+                        result.get('url'),
+                        result.get('type'),
+                        result.get('severity'),
+                        get_vulnerability_signature(result),
+                        json.dumps(result),
+                    )
+                    for result in results
+                ),
+            )
+
+    def save_trace(self, scan_id, trace_events):
+        """Store a saved scan's Chrome trace-event dict"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO traces (scan_id, data) VALUES (?, ?)",
+                (scan_id, json.dumps(trace_events)),
+            )
+
+    def get_trace(self, scan_id):
+        """A scan's trace-event JSON text, or None if it has none"""
+        row = self._connect().execute("SELECT data FROM traces WHERE scan_id = ?", (scan_id,)).fetchone()
+        return row["data"] if row else None
+
+    def list_scans(self, target=None, limit=50, offset=0):
+        query = ("SELECT id, target, created_at, total_vulnerabilities, unique_vulnerabilities,"
+                 " url_count FROM scans")
+        params = []
+        if target:
+            query += " WHERE target = ?"
+            params.append(target)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        return [dict(row) for row in self._connect().execute(query, params)]
+
+    def get_scan(self, scan_id, include_results=True):
+        """Rebuild the scan_data dict of a stored scan, or None if unknown"""
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        if row is None:
+            return None
+
+        scan_data = {
+            "scan_id": row["id"],
+            "target": row["target"],
+            "created_at": row["created_at"],
+            "discovered_urls": [
+                r["url"] for r in conn.execute("SELECT url FROM urls WHERE scan_id = ? ORDER BY rowid", (scan_id,))
+            ],
+            "total_vulnerabilities": row["total_vulnerabilities"],
+            "unique_vulnerabilities": row["unique_vulnerabilities"],
+            "vulnerability_analysis": json.loads(row["analysis"]),
+            "url_templates": json.loads(row["url_templates"]),
+            "endpoints": json.loads(row["endpoints"]),
+            "scan_stats": json.loads(row["stats"]),
+            "scan_trace": json.loads(row["trace_summary"]),
+        }
+        if include_results:
+            scan_data["results"] = [
+                json.loads(r["data"])
+                for r in conn.execute("SELECT data FROM findings WHERE scan_id = ? ORDER BY id", (scan_id,))
+            ]
+        return scan_data
+
+    def get_findings(self, scan_id, severity=None, vuln_type=None, signature=None, limit=100, offset=0):
+        """One page of a scan's findings plus the total matching the filters"""
+        where = ["scan_id = ?"]
+        params = [scan_id]
+        if severity:
+            where.append("severity = ?")
+            params.append(severity)
+        if vuln_type:
+            where.append("type = ?")
+            params.append(vuln_type)
+        if signature:
+            where.append("signature = ?")
+            params.append(signature)
+        clause = " AND ".join(where)
+
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM findings WHERE {clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT data FROM findings WHERE {clause} ORDER BY id LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "findings": [json.loads(r["data"]) for r in rows],
+        }
@@ -0,0 +1,90 @@
+"""
+Scan worker: claims per-URL scan tasks from a work queue, runs every check
+against the URL and reports the findings back to the queue.
+
+Workers are started by the app (SCAN_LOCAL_WORKERS), or as separate
+processes on the same host as the app's SQLite queue file with:
+
+    python worker.py --queue sqlite:///scan_results/queue.db --processes 4
+
+The SQLite queue is single-host: it runs in WAL mode, which needs shared
+memory on one machine, and SQLite locking is unreliable over network
+filesystems, so claims are only atomic between processes on this host.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+from scanner.client import HttpClientConfig
+from scanner.engine import ScanEngine
+from scanner.scan import scan_url_async
+from workqueue import create_work_queue
+
+# Requests in flight per worker process, and URLs it scans at once
+WORKER_CONCURRENCY = 50
+WORKER_TASKS = 4
+
+# Seconds a claim waits for work before checking again
+CLAIM_TIMEOUT = 1.0
+
+
+async def run_worker_async(work_queue, worker_id, concurrency=WORKER_CONCURRENCY, tasks=WORKER_TASKS):
+    """Claim and scan URLs forever on one pooled engine, `tasks` at a time"""
+    http_config = HttpClientConfig(pool_size=concurrency, per_host_pool_size=concurrency)
+
+    async with ScanEngine(concurrency=concurrency, http_config=http_config) as engine:
+        async def consume():
+            while True:
+                task = await asyncio.to_thread(work_queue.claim, worker_id, CLAIM_TIMEOUT)
+                if task is None:
+                    continue
+                results = await scan_url_async(task["url"], engine, endpoints=task.get("endpoints"))
+                await asyncio.to_thread(work_queue.complete, task, results)
+
+        await asyncio.gather(*(consume() for _ in range(tasks)))
+
+
+def run_worker(work_queue, worker_id=None, concurrency=WORKER_CONCURRENCY, tasks=WORKER_TASKS):
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        asyncio.run(run_worker_async(work_queue, worker_id, concurrency, tasks))
+    except KeyboardInterrupt:
+        pass
+
+
+def start_local_workers(work_queue, processes, concurrency=WORKER_CONCURRENCY, tasks=WORKER_TASKS):
+    """Start `processes` daemon worker processes consuming `work_queue`"""
+    workers = []
+    for _ in range(processes):
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(work_queue,),
+            kwargs={"concurrency": concurrency, "tasks": tasks},
+            daemon=True,
+        )
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scan workers against a shared work queue")
+    parser.add_argument("--queue", required=True, help="sqlite:///<path> of the app's queue (same host only)")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to run")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="requests in flight per process")
+    parser.add_argument("--tasks", type=int, default=WORKER_TASKS, help="URLs scanned at once per process")
+    args = parser.parse_args()
+
+    work_queue = create_work_queue(args.queue)
+    workers = start_local_workers(work_queue, args.processes, args.concurrency, args.tasks)
+    print(f"[+] {len(workers)} worker process(es) consuming {args.queue}")
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# A claimed SQLite task whose worker has not reported back within this many
+# seconds is handed to another worker (the first one is assumed dead)
+LEASE_SECONDS = 300
+
+
+class MemoryWorkQueue:
+    """
+    Work queue held in this process, shared with worker processes it starts
+    (see worker.start_local_workers) through multiprocessing queues.
+    """
+
+    def __init__(self):
+        self.tasks = multiprocessing.Queue()
+        self.done = multiprocessing.Queue()
+        self._batches = {}
+        self._lock = threading.Lock()
+        self._dispatcher = None
+
+    def __getstate__(self):
+        # Worker processes only need the two shared queues
+        return {"tasks": self.tasks, "done": self.done}
+
+    def __setstate__(self, state):
+        self.tasks = state["tasks"]
+        self.done = state["done"]
+        self._batches = {}
+        self._lock = threading.Lock()
+        self._dispatcher = None
+
+    def submit(self, batch_id, tasks):
+        with self._lock:
+            self._batches.setdefault(batch_id, queue.Queue())
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True, name="workqueue-dispatch")
+                self._dispatcher.start()
+        for task in tasks:
+            self.tasks.put(dict(task, id=uuid.uuid4().hex, batch_id=batch_id))
+
+    def claim(self, worker_id, timeout=1.0):
+        try:
+            return self.tasks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def complete(self, task, results):
+        self.done.put((task["batch_id"], task["url"], results))
+
+    def fetch_results(self, batch_id, timeout=1.0):
+        """(url, results) pairs completed for the batch since the last call"""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+        if batch is None:
+            return []
+        completed = []
+        try:
+            completed.append(batch.get(timeout=timeout))
+            while True:
+                completed.append(batch.get_nowait())
+        except queue.Empty:
+            pass
+        return completed
+
+    def finish_batch(self, batch_id):
+        with self._lock:
+            self._batches.pop(batch_id, None)
+
+    def pending(self):
+        """Tasks waiting to be claimed, or None where the platform can't tell (macOS)"""
+        try:
+            return self.tasks.qsize()
+        except NotImplementedError:
+            return None
+
+    def _dispatch(self):
+        # Route results from the shared queue to the batch waiting for them
+        while True:
+            batch_id, url, results = self.done.get()
+            with self._lock:
+                batch = self._batches.get(batch_id)
+            if batch is not None:
+                batch.put((url, results))
+
+
+class SQLiteWorkQueue:
+    """
+    Work queue in a SQLite database, so worker processes on this host claim
+    tasks atomically and report results. Single-host only: WAL mode needs
+    shared memory on one machine, and the file must not be shared over a
+    network filesystem, where SQLite locking is unreliable.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch_id TEXT NOT NULL,
+        url TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        worker_id TEXT,
+        claimed_at REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        results TEXT,
+        endpoints TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_batch ON tasks (batch_id, status);
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, poll_interval=0.2):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+            # Queue files created before tasks carried their endpoints
+            if "endpoints" not in {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}:
+                conn.execute("ALTER TABLE tasks ADD COLUMN endpoints TEXT")
+
+    def __getstate__(self):
+        return {"path": self.path, "lease_seconds": self.lease_seconds, "poll_interval": self.poll_interval}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["lease_seconds"], state["poll_interval"])
+
+    def _connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.local.conn = conn
+        return conn
+
+    def submit(self, batch_id, tasks):
+        conn = self._connect()
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO tasks (batch_id, url, endpoints) VALUES (?, ?, ?)",
+            ((batch_id, task["url"], json.dumps(task.get("endpoints"))) for task in tasks),
+        )
+        conn.execute("COMMIT")
+
+    def claim(self, worker_id, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            task = self._claim_once(worker_id)
+            if task is not None or time.monotonic() >= deadline:
+                return task
+            time.sleep(self.poll_interval)
+
+    def _claim_once(self, worker_id):
+        conn = self._connect()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock, so no two workers claim the same row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, batch_id, url, endpoints FROM tasks"
+                " WHERE status = 'pending' OR (status = 'claimed' AND claimed_at < ?)"
+                " ORDER BY id LIMIT 1",
+                (now - self.lease_seconds,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE tasks SET status = 'claimed', worker_id = ?, claimed_at = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    (worker_id, now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {"id": row[0], "batch_id": row[1], "url": row[2], "endpoints": json.loads(row[3] or "null")}
+
+    def complete(self, task, results):
+        self._connect().execute(
+            "UPDATE tasks SET status = 'done', results = ? WHERE id = ? AND status = 'claimed'",
+            (json.dumps(results), task["id"]),
+        )
+
+    def fetch_results(self, batch_id, timeout=1.0):
+        """(url, results) pairs completed for the batch since the last call"""
+        deadline = time.monotonic() + timeout
+        conn = self._connect()
+        while True:
+            rows = conn.execute(
+                "SELECT id, url, results FROM tasks WHERE batch_id = ? AND status = 'done' ORDER BY id",
+                (batch_id,),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE tasks SET status = 'collected' WHERE id = ?",
+                    ((row[0],) for row in rows),
+                )
+                return [(row[1], json.loads(row[2])) for row in rows]
+            if time.monotonic() >= deadline:
+                return []
+            time.sleep(self.poll_interval)
+
+    def finish_batch(self, batch_id):
+        self._connect().execute("DELETE FROM tasks WHERE batch_id = ?", (batch_id,))
+
+    def pending(self):
+        """Tasks waiting to be claimed (expired claims not included)"""
+        return self._connect().execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending'").fetchone()[0]
+
+
+def create_work_queue(spec):
+    """
+    Build a work queue from a spec string:
+    "memory" for the in-process queue, "sqlite:///<path>" for a file shared
+    by processes on this host.
+    """
+    if spec == "memory":
+        return MemoryWorkQueue()
+    if spec.startswith("sqlite:///"):
+        return SQLiteWorkQueue(spec[len("sqlite:///"):])
+    raise ValueError(f"Unknown work queue '{spec}' (expected 'memory' or 'sqlite:///<path>')")
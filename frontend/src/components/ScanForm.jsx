@@ -1,13 +1,38 @@
 // src/components/ScanForm.jsx
-import React, { useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { Target, Globe, Search, XCircle, Activity } from "lucide-react";
 
+// Milliseconds between status polls once a scan's event stream has closed
+const POLL_INTERVAL_MS = 2000;
+
 export default function ScanForm({ darkMode }) {
   const [url, setUrl] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [lastScanData, setLastScanData] = useState(null);
 
+  // Close any open event stream and stop polling when the form unmounts
+  const eventSourceRef = useRef(null);
+  const pollRef = useRef(null);
+  useEffect(() => () => {
+    eventSourceRef.current?.close();
+    clearTimeout(pollRef.current);
+  }, []);
+
+  const finishScan = (data) => {
+    setLastScanData(data);
+    setLoading(false);
+
+    // Fire a global event so ScanResults can update
+    window.dispatchEvent(new CustomEvent("new-scan", { detail: data }));
+  };
+
+  const failScan = (message) => {
+    setError(message);
+    setLoading(false);
+    window.dispatchEvent(new CustomEvent("scan-failed"));
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     setError(null);
@@ -20,7 +45,7 @@ export default function ScanForm({ darkMode }) {
     setLoading(true);
     try {
       const response = await fetch(
-        `${process.env.REACT_APP_API_BASE_URL}/scan`,
+        `${process.env.REACT_APP_API_BASE_URL}/scans`,
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
@@ -33,18 +58,79 @@ export default function ScanForm({ darkMode }) {
         throw new Error(errJson.error || "Scan request failed");
       }
 
-      const data = await response.json();
-      setLastScanData(data);
-
-      // Fire a global event so ScanResults can update
-      window.dispatchEvent(new CustomEvent("new-scan", { detail: data }));
+      const job = await response.json();
+      window.dispatchEvent(
+        new CustomEvent("scan-started", { detail: { id: job.id, target: url.trim() } })
+      );
+      streamScan(job.id);
     } catch (err) {
       setError(err.message);
-    } finally {
       setLoading(false);
     }
   };
 
+  // Follow the job's event stream so ScanResults can render findings as they arrive
+  const streamScan = (jobId) => {
+    eventSourceRef.current?.close();
+    clearTimeout(pollRef.current);
+    const source = new EventSource(
+      `${process.env.REACT_APP_API_BASE_URL}/scans/${jobId}/events`
+    );
+    eventSourceRef.current = source;
+
+    const forward = (name) => (e) =>
+      window.dispatchEvent(new CustomEvent(name, { detail: JSON.parse(e.data) }));
+    source.addEventListener("finding", forward("scan-finding"));
+    source.addEventListener("progress", forward("scan-progress"));
+    source.addEventListener("crawled", forward("scan-crawled"));
+
+    source.addEventListener("complete", (e) => {
+      source.close();
+      finishScan(JSON.parse(e.data));
+    });
+
+    source.addEventListener("failed", (e) => {
+      source.close();
+      failScan(JSON.parse(e.data).error || "Scan failed");
+    });
+
+    // The browser retries dropped connections itself; a CLOSED stream got a
+    // non-200 reconnect (job pruned, API restarted, proxy error) and won't
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        source.close();
+        pollScan(jobId);
+      }
+    };
+  };
+
+  // Poll the job until it finishes; GET /scans/<id> also serves stored scans
+  const pollScan = async (jobId) => {
+    try {
+      const response = await fetch(
+        `${process.env.REACT_APP_API_BASE_URL}/scans/${jobId}`
+      );
+      if (!response.ok) {
+        throw new Error(
+          response.status === 404
+            ? "Scan not found; the server may have restarted"
+            : "Lost connection to the scan"
+        );
+      }
+
+      const job = await response.json();
+      if (job.status === "completed" && job.scan_data) {
+        finishScan(job.scan_data);
+      } else if (job.status === "failed") {
+        failScan(job.error || "Scan failed");
+      } else {
+        pollRef.current = setTimeout(() => pollScan(jobId), POLL_INTERVAL_MS);
+      }
+    } catch (err) {
+      failScan(err.message);
+    }
+  };
+
   return (
     <div className={`relative overflow-hidden rounded-2xl shadow-xl backdrop-blur-sm border transition-all duration-300 ${
       darkMode
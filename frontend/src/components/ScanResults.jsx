@@ -1,5 +1,5 @@
 // src/components/ScanResults.jsx
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { 
   Shield, 
   Download, 
@@ -16,23 +16,113 @@ import {
   Eye
 } from "lucide-react";
 
+// Running tallies for a scan that is still streaming findings, grouped the
+// same way as the backend's analyze_vulnerabilities (type|description)
+const newLiveScan = (target) => ({
+  target,
+  results: [],
+  discoveredUrls: [],
+  totalSeverityCounts: {},
+  unique: new Map(),
+});
+
+const addLiveFinding = (live, result) => {
+  live.results.push(result);
+  const severity = result.severity || "Unknown";
+  live.totalSeverityCounts[severity] = (live.totalSeverityCounts[severity] || 0) + 1;
+
+  const signature = `${result.type || ""}|${result.description || ""}`.toLowerCase().trim();
+  let entry = live.unique.get(signature);
+  if (!entry) {
+    entry = { result, affectedUrls: new Set() };
+    live.unique.set(signature, entry);
+  }
+  entry.affectedUrls.add(result.url || "Unknown URL");
+};
+
+const liveScanData = (live) => {
+  const uniqueResults = [];
+  const uniqueSeverityCounts = {};
+  live.unique.forEach(({ result, affectedUrls }) => {
+    const severity = result.severity || "Unknown";
+    uniqueSeverityCounts[severity] = (uniqueSeverityCounts[severity] || 0) + 1;
+    uniqueResults.push({
+      ...result,
+      affected_urls: [...affectedUrls],
+      affected_urls_count: affectedUrls.size,
+    });
+  });
+
+  return {
+    target: live.target,
+    discovered_urls: live.discoveredUrls,
+    total_vulnerabilities: live.results.length,
+    unique_vulnerabilities: uniqueResults.length,
+    vulnerability_analysis: {
+      total_count: live.results.length,
+      unique_count: uniqueResults.length,
+      unique_results: uniqueResults,
+      total_severity_counts: live.totalSeverityCounts,
+      unique_severity_counts: uniqueSeverityCounts,
+    },
+    results: live.results,
+  };
+};
+
 export default function ScanResults({ darkMode }) {
   const [scanData, setScanData] = useState(null);
   const [error, setError] = useState(null);
   const [downloadingHtml, setDownloadingHtml] = useState(false);
   const [selectedSeverity, setSelectedSeverity] = useState('all');
+  const [progress, setProgress] = useState(null);
+  const liveScanRef = useRef(null);
+  const [, setLiveVersion] = useState(0);
 
-  // Whenever a new scan is fired by ScanForm:
+  // Follow the scan lifecycle events fired by ScanForm:
   useEffect(() => {
+    const handleScanStarted = (e) => {
+      liveScanRef.current = newLiveScan(e.detail.target);
+      setScanData(null);
+      setProgress({ urls_crawled: 0, requests_sent: 0, findings: 0 });
+      setError(null);
+      setLiveVersion((v) => v + 1);
+    };
+    const handleFinding = (e) => {
+      if (!liveScanRef.current) return;
+      addLiveFinding(liveScanRef.current, e.detail);
+      setLiveVersion((v) => v + 1);
+    };
+    const handleCrawled = (e) => {
+      if (!liveScanRef.current) return;
+      liveScanRef.current.discoveredUrls = e.detail.discovered_urls;
+      setLiveVersion((v) => v + 1);
+    };
+    const handleProgress = (e) => setProgress(e.detail);
     const handleNewScan = (e) => {
+      liveScanRef.current = null;
+      setProgress(null);
       setScanData(e.detail);
       setError(null);
     };
-    window.addEventListener("new-scan", handleNewScan);
-    return () => window.removeEventListener("new-scan", handleNewScan);
+    const handleFailed = () => setProgress(null);
+
+    const listeners = {
+      "scan-started": handleScanStarted,
+      "scan-finding": handleFinding,
+      "scan-crawled": handleCrawled,
+      "scan-progress": handleProgress,
+      "new-scan": handleNewScan,
+      "scan-failed": handleFailed,
+    };
+    Object.entries(listeners).forEach(([name, fn]) => window.addEventListener(name, fn));
+    return () =>
+      Object.entries(listeners).forEach(([name, fn]) => window.removeEventListener(name, fn));
   }, []);
 
-  if (!scanData) {
+  // Final results once complete, otherwise whatever has streamed in so far
+  const displayData = scanData || (liveScanRef.current && liveScanData(liveScanRef.current));
+
+  if (!displayData) {
     return (
       <div className={`relative overflow-hidden rounded-2xl shadow-xl border transition-all duration-300 ${
         darkMode
@@ -79,7 +169,7 @@ export default function ScanResults({ darkMode }) {
       unique_severity_counts,
       unique_results,
     },
-  } = scanData;
+  } = displayData;
 
   const getSeverityColor = (severity) => {
     if (darkMode) {
@@ -120,7 +210,7 @@ export default function ScanResults({ darkMode }) {
     try {
       const filename = `scan_report_${Date.now()}.json`;
       const blob = new Blob(
-        [JSON.stringify(scanData, null, 2)],
+        [JSON.stringify(displayData, null, 2)],
         { type: "application/json" }
       );
       const url = URL.createObjectURL(blob);
@@ -147,7 +237,12 @@ export default function ScanResults({ darkMode }) {
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ scan_data: scanData }),
+          // Stored scans are rendered server-side by id; live ones are sent whole
+          body: JSON.stringify(
+            displayData.scan_id
+              ? { scan_id: displayData.scan_id }
+              : { scan_data: displayData }
+          ),
         }
       );
       if (!response.ok) {
@@ -174,6 +269,23 @@ export default function ScanResults({ darkMode }) {
 
   return (
     <div className="space-y-8">
+      {/* Live progress while findings are still streaming in */}
+      {progress && (
+        <div className={`flex flex-wrap items-center gap-4 p-4 rounded-2xl border shadow-lg ${
+          darkMode
+            ? 'bg-slate-800/80 border-cyan-700/60 text-slate-200'
+            : 'bg-white/80 border-blue-200/60 text-slate-700'
+        }`}>
+          <div className={`w-4 h-4 border-2 rounded-full animate-spin ${
+            darkMode ? 'border-cyan-400/30 border-t-cyan-400' : 'border-blue-500/30 border-t-blue-500'
+          }`} />
+          <span className="font-semibold">Scan in progress</span>
+          <span className="text-sm">{progress.urls_crawled} URLs crawled</span>
+          <span className="text-sm">{progress.requests_sent} requests sent</span>
+          <span className="text-sm">{progress.findings} findings</span>
+        </div>
+      )}
+
       {/* Summary Cards */}
       <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
         <div className={`relative overflow-hidden rounded-2xl shadow-lg border transition-all duration-300 hover:shadow-xl ${